@@ -0,0 +1,144 @@
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), "shiny", "basic-navigation")
+sys.path.insert(0, APP_DIR)
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from data_store import YearSliceStore
+from geometry import GeometryIndex
+from plots import INDUSTRY_PLOTS, PARTICIPATION_TYPES, geo_figure, industry_figure, nation_figure
+from dataset_schema import INDUSTRY_DTYPES, NATION_DTYPES, read_dataset
+import loaders
+
+# Timings of the work behind every reactive calc and render function of the
+# Shiny app (shiny/basic-navigation/app.py), called directly on the datasets
+# in --data-dir with the slider and radio inputs swept over all their values.
+# Plots are rendered to PNG like `render.plot` does; run on its own, the JSON
+# result is written to stdout (run_benchmarks.py calls `bench` directly).
+
+NATION_PARTICIPATION = ["average_f", "average_b", "average_gvcs", "average_gvcc"]
+
+
+class Timings:
+    """Wall times of repeated calls, grouped by name."""
+
+    def __init__(self):
+        self.seconds = {}
+
+    def call(self, name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.seconds.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        out = {}
+        for name, seconds in self.seconds.items():
+            ordered = sorted(seconds)
+            out[name] = {
+                "calls": len(ordered),
+                "min": ordered[0],
+                "median": statistics.median(ordered),
+                "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+                "max": ordered[-1],
+                "total": sum(ordered),
+            }
+        return out
+
+
+def render_png(fig):
+    """Render a figure to PNG bytes (the server side of `render.plot`)."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=96)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def bench(data_dir, repeat=3, tolerance=0.05, vega=True):
+    """
+    Time the data loading and every output of the app.
+
+    Parameters:
+    - data_dir (str): Folder with processed_data.csv and aggregated_data.csv.
+    - repeat (int): Loading runs; the callback sweep runs once per repeat.
+    - tolerance (float): Geometry simplification tolerance (as GEO_TOLERANCE).
+    - vega (bool): Also time the Vega-Lite spec builders of PLOT_BACKEND=vega.
+
+    Returns:
+    - dict: Per function, call count and min/median/p95/max/total seconds.
+    """
+    timings = Timings()
+    nation_path = os.path.join(data_dir, "processed_data.csv")
+    industry_path = os.path.join(data_dir, "aggregated_data.csv")
+
+    for _ in range(repeat):
+        df = timings.call("load.nation_data", read_dataset, nation_path, NATION_DTYPES)
+        df2 = timings.call("load.industry_data", read_dataset, industry_path, INDUSTRY_DTYPES)
+        store = YearSliceStore(df, df2)
+        timings.call("load.year_store", lambda: (store.nation_year(None), store.industry_year(None)))
+        world = timings.call("load.world_boundaries", loaders.world_boundaries.__wrapped__)
+        geo_index = timings.call("load.geometry_index", GeometryIndex, world, tolerance)
+
+    if vega:
+        from vega_plots import geo_spec, industry_spec, nation_spec
+
+    countries = store.countries[:4]
+    for _ in range(repeat):
+        for year in store.years:
+            # Geo Plot tab
+            data = timings.call("calc.filtered_geo_data", geo_index.attach, store.nation_year(year), "CE")
+            timings.call("render.top5_table", store.top, year)
+            timings.call("render.bottom5_table", store.bottom, year)
+            timings.call("render.geo_plot", lambda: render_png(geo_figure(data, year)))
+            if vega:
+                timings.call("vega.geo_plot", geo_spec, store.nation_year(year), year, "countries.json")
+
+            # Industry Level tab
+            for participation_type in PARTICIPATION_TYPES:
+                for output_id, (classification, color) in INDUSTRY_PLOTS.items():
+                    class_data = store.industry_class(year, classification)
+                    timings.call(f"render.{output_id}", lambda: render_png(
+                        industry_figure(class_data, classification, color, participation_type)
+                    ))
+                    if vega:
+                        timings.call(f"vega.{output_id}", industry_spec, class_data, classification, color,
+                                     participation_type)
+
+        # Nation Level tab: four countries and all countries
+        for participation in NATION_PARTICIPATION:
+            for all_countries in (False, True):
+                data = timings.call("calc.filtered_nation_data",
+                                    lambda: df if all_countries else df[df["country"].isin(countries)])
+                timings.call("render.scatter_plot", lambda: render_png(nation_figure(data, participation)))
+                if vega:
+                    timings.call("vega.scatter_plot", nation_spec, data, participation)
+
+    return timings.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the Shiny app's callbacks on a set of datasets.")
+    parser.add_argument("--data-dir", default=loaders.data_dir)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--no-vega", action="store_true", help="skip the Vega-Lite spec builders")
+    args = parser.parse_args(argv)
+
+    results = bench(args.data_dir, repeat=args.repeat, tolerance=args.tolerance, vega=not args.no_vega)
+    json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
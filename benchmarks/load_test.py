@@ -0,0 +1,321 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), "shiny", "basic-navigation")
+
+# Headless load test of the Shiny app (shiny/basic-navigation/app.py): N
+# simulated browser sessions speak the Shiny websocket protocol to one
+# worker, each sending a random sweep of geo_year, year, participation_type
+# and the four country selectors, and timing every update until the server
+# reports idle (all invalidated outputs sent). Runs locally only, e.g.
+#     python benchmarks/load_test.py --sessions 1 5 10 20 --updates 30
+#     python benchmarks/load_test.py --env FIGURE_CACHE_MB=0 --env PLOT_BACKEND=vega
+#     python benchmarks/load_test.py --url http://localhost:8000 --pid 12345
+# Without --url the app is started on --port and stopped afterwards.
+
+# Inputs swept by the simulated sessions
+SWEEPS = ("geo_year", "year", "participation_type", "countries")
+
+PARTICIPATION_TYPES = ("f", "b", "gvcs", "gvcc")
+
+OUTPUTS = ("geo_plot", "top5_table", "bottom5_table", "scatter_plot",
+           "agriculture_plot", "manufacturing_plot", "service_plot", "mining_plot")
+
+
+def page_choices(url):
+    """
+    Read the input choices from the app's page.
+
+    Parameters:
+    - url (str): Base URL of the app.
+
+    Returns:
+    - dict: `countries` (country1 options), `years` (slider min/max) and `regions`.
+    """
+    with urllib.request.urlopen(url, timeout=30) as response:
+        html = response.read().decode()
+
+    def options(input_id):
+        select = re.search(rf'<select[^>]*id="{input_id}"[^>]*>(.*?)</select>', html, re.S)
+        return re.findall(r'<option value="([^"]*)"', select.group(1)) if select else []
+
+    slider = re.search(r'id="geo_year"[^>]*data-min="(\d+)"[^>]*data-max="(\d+)"', html)
+    years = (int(slider.group(1)), int(slider.group(2))) if slider else (2000, 2014)
+    return {"countries": options("country1"), "years": years, "regions": options("geo_region") or ["World"]}
+
+
+def initial_inputs(choices, width=600, height=400):
+    """Inputs and client data a browser sends when it opens the app."""
+    countries = choices["countries"]
+    data = {
+        "geo_year": choices["years"][0],
+        "geo_region": choices["regions"][0],
+        "country1": countries[0], "country2": countries[1],
+        "country3": countries[2], "country4": countries[3],
+        "participation": "average_f",
+        "all_countries": False,
+        "year": choices["years"][0],
+        "participation_type": "f",
+        ".clientdata_pixelratio": 1,
+        ".clientdata_url_protocol": "http:",
+        ".clientdata_url_hostname": "localhost",
+        ".clientdata_url_pathname": "/",
+        ".clientdata_url_search": "",
+        ".clientdata_url_hash_initial": "",
+        ".clientdata_url_hash": "",
+        ".clientdata_singletons": "",
+    }
+    for output_id in OUTPUTS:
+        data[f".clientdata_output_{output_id}_width"] = width * 2 if output_id == "geo_plot" else width
+        data[f".clientdata_output_{output_id}_height"] = height
+        data[f".clientdata_output_{output_id}_hidden"] = False
+    return data
+
+
+def next_update(sweep, inputs, choices, rng):
+    """Changed input values for one step of `sweep` (always different from `inputs`)."""
+    first, last = choices["years"]
+    if sweep in ("geo_year", "year"):
+        return {sweep: rng.choice([y for y in range(first, last + 1) if y != inputs[sweep]])}
+    if sweep == "participation_type":
+        return {sweep: rng.choice([p for p in PARTICIPATION_TYPES if p != inputs[sweep]])}
+    current = [inputs[f"country{i}"] for i in range(1, 5)]
+    selected = current
+    while selected == current:
+        selected = rng.sample(choices["countries"], 4)
+    return {f"country{i}": country for i, country in enumerate(selected, start=1)}
+
+
+async def wait_idle(ws, timeout):
+    """
+    Read server messages until the session is idle again.
+
+    Returns:
+    - tuple: (number of output values received, number of output errors).
+    """
+    values = errors = 0
+    busy = False
+    while True:
+        message = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+        values += len(message.get("values") or {})
+        errors += len(message.get("errors") or {})
+        if message.get("busy") == "busy":
+            busy = True
+        elif message.get("busy") == "idle" and busy:
+            return values, errors
+
+
+async def run_session(ws_url, choices, updates, think, seed, timeout, samples):
+    """
+    One simulated user: open the app, then send `updates` input changes.
+
+    Every step appends (sweep, seconds, outputs received, ok) to `samples`;
+    "init" is the time to the first complete page.
+    """
+    rng = random.Random(seed)
+    inputs = initial_inputs(choices)
+    async with websockets.connect(ws_url, max_size=None, open_timeout=timeout) as ws:
+        start = time.perf_counter()
+        await ws.send(json.dumps({"method": "init", "data": inputs}))
+        try:
+            values, errors = await wait_idle(ws, timeout)
+            samples.append(("init", time.perf_counter() - start, values, errors == 0))
+        except asyncio.TimeoutError:
+            samples.append(("init", time.perf_counter() - start, 0, False))
+            return
+
+        for _ in range(updates):
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+            sweep = rng.choice(SWEEPS)
+            change = next_update(sweep, inputs, choices, rng)
+            inputs.update(change)
+            start = time.perf_counter()
+            await ws.send(json.dumps({"method": "update", "data": change}))
+            try:
+                values, errors = await wait_idle(ws, timeout)
+                samples.append((sweep, time.perf_counter() - start, values, errors == 0))
+            except asyncio.TimeoutError:
+                samples.append((sweep, time.perf_counter() - start, 0, False))
+                return
+
+
+def percentiles(seconds):
+    """p50/p90/p95/p99/max of a list of latencies, in milliseconds."""
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1e3
+    return {"p50_ms": at(0.5), "p90_ms": at(0.9), "p95_ms": at(0.95), "p99_ms": at(0.99),
+            "max_ms": ordered[-1] * 1e3, "mean_ms": statistics.mean(ordered) * 1e3}
+
+
+def rss_mb(pid):
+    """Resident set size of process `pid` (Linux /proc; None elsewhere or without a pid)."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_level(ws_url, choices, sessions, updates, think, seed, timeout):
+    """
+    Run `sessions` concurrent simulated users and summarize their updates.
+
+    Returns:
+    - dict: Session/update counts, throughput (updates/s) and latency
+      percentiles overall, for the initial page and per swept input.
+    """
+    samples = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_session(ws_url, choices, updates, think, seed * 1000 + i, timeout, samples)
+        for i in range(sessions)
+    ], return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    failed_sessions = [repr(r) for r in results if isinstance(r, BaseException)]
+    steps = [s for s in samples if s[0] != "init"]
+    ok = [s for s in steps if s[3]]
+    level = {
+        "sessions": sessions,
+        "failed_sessions": len(failed_sessions),
+        "seconds": elapsed,
+        "updates": len(steps),
+        "failed_updates": len(steps) - len(ok),
+        "throughput_per_s": len(ok) / elapsed if elapsed > 0 else None,
+        "outputs_per_s": sum(s[2] for s in ok) / elapsed if elapsed > 0 else None,
+        "latency": percentiles([s[1] for s in ok]),
+        "init": percentiles([s[1] for s in samples if s[0] == "init" and s[3]]),
+        "by_input": {sweep: percentiles([s[1] for s in ok if s[0] == sweep]) for sweep in SWEEPS},
+    }
+    if failed_sessions:
+        level["errors"] = failed_sessions[:5]
+    return level
+
+
+def start_server(port, env=None, startup_timeout=120):
+    """Start the app with `shiny run` on localhost:`port` and wait until it answers."""
+    command = [sys.executable, "-m", "shiny", "run", "--host", "127.0.0.1", "--port", str(port), "app.py"]
+    server = subprocess.Popen(command, cwd=APP_DIR, env={**os.environ, **(env or {})},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The app exited during startup (code {server.returncode})")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2).close()
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"The app did not answer on port {port} within {startup_timeout}s")
+
+
+def fetch_metrics(url):
+    """The app's /metrics snapshot (per-output latencies), None if unavailable."""
+    try:
+        with urllib.request.urlopen(f"{url}/metrics", timeout=10) as response:
+            return json.load(response)
+    except (OSError, ValueError):
+        return None
+
+
+def print_report(report):
+    print(f"{'sessions':>8} {'updates':>8} {'failed':>7} {'upd/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'init p95':>9} {'RSS MB':>8} {'growth':>8}")
+    for level in report["levels"]:
+        latency, init = level["latency"], level["init"]
+        rss = f"{level['rss_after_mb']:8.0f}" if level.get("rss_after_mb") is not None else f"{'-':>8}"
+        growth = f"{level['rss_growth_mb']:+8.0f}" if level.get("rss_growth_mb") is not None else f"{'-':>8}"
+        print(f"{level['sessions']:>8} {level['updates']:>8} {level['failed_updates'] + level['failed_sessions']:>7} "
+              f"{level['throughput_per_s'] or 0:>8.1f} {latency.get('p50_ms', 0):>9.1f} "
+              f"{latency.get('p95_ms', 0):>9.1f} {latency.get('p99_ms', 0):>9.1f} "
+              f"{init.get('p95_ms', 0):>9.1f} {rss} {growth}")
+    if report.get("rss_start_mb") is not None:
+        print(f"Server RSS: {report['rss_start_mb']:.0f} MB at start, {report['rss_end_mb']:.0f} MB at the end")
+
+    metrics = (report.get("server_metrics") or {}).get("latency", {})
+    if metrics:
+        print("Slowest outputs (server side, p95):")
+        slowest = sorted(metrics.items(), key=lambda item: item[1].get("p95_ms") or 0, reverse=True)
+        for name, summary in slowest[:8]:
+            print(f"  {name:<30} p95 {summary['p95_ms']:9.1f} ms  ({summary['count']} renders)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Shiny app with simulated concurrent sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10],
+                        help="concurrent sessions, one run per value")
+    parser.add_argument("--updates", type=int, default=20, help="input changes per session")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between changes (seconds)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for one update")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="test a running app instead of starting one")
+    parser.add_argument("--pid", type=int, help="process of the app given by --url, for its RSS")
+    parser.add_argument("--port", type=int, default=8765, help="port of the started app")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="environment of the started app, e.g. FIGURE_CACHE_MB=0")
+    parser.add_argument("--output", default="load_test.json", help="result file (JSON)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        env = dict(item.split("=", 1) for item in args.env)
+        server = start_server(args.port, env=env)
+        url, pid = f"http://127.0.0.1:{args.port}", server.pid
+    ws_url = re.sub(r"^http", "ws", url) + "/websocket/"
+
+    try:
+        choices = page_choices(url)
+        report = {
+            "meta": {"url": url, "updates": args.updates, "think": args.think, "seed": args.seed,
+                     "env": args.env, "countries": len(choices["countries"]), "years": choices["years"]},
+            "rss_start_mb": rss_mb(pid),
+            "levels": [],
+        }
+        for sessions in args.sessions:
+            before = rss_mb(pid)
+            level = asyncio.run(run_level(ws_url, choices, sessions, args.updates, args.think,
+                                          args.seed, args.timeout))
+            level["rss_before_mb"], level["rss_after_mb"] = before, rss_mb(pid)
+            if before is not None and level["rss_after_mb"] is not None:
+                level["rss_growth_mb"] = level["rss_after_mb"] - before
+            report["levels"].append(level)
+        report["rss_end_mb"] = rss_mb(pid)
+        report["server_metrics"] = fetch_metrics(url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
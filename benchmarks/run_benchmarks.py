@@ -0,0 +1,234 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import pandas as pd
+
+from aggregate import aggregate_datasets, write_datasets
+from bench_shiny import bench as bench_shiny
+from clean import clean_gvc
+from ingest import load_co2, read_gvc_csv
+from merge import merge_co2
+from schema import apply_schema
+from sinks import write_table
+from streaming import stream_gvc
+from synthetic import generate
+
+# Benchmark suite of the processing pipeline (src/) and the Shiny callbacks
+# (bench_shiny.py), on synthetic WIOD-layout inputs of a chosen scale, e.g.
+#     python benchmarks/run_benchmarks.py --countries 42 --years 2000 2014
+#     python benchmarks/run_benchmarks.py --countries 200 --output big.json --baseline small.json
+# Every stage runs `--repeat` times on the same inputs; the JSON result keeps
+# all run times plus their min/median, the row counts and the scale.
+
+# Slowdown (current / baseline median) reported as a regression
+DEFAULT_THRESHOLD = 1.25
+
+
+def time_stage(results, name, func, repeat, rows_in=None):
+    """
+    Run `func()` `repeat` times and record its wall times under `name`.
+
+    Parameters:
+    - results (dict): Stage results, updated in place.
+    - name (str): Stage name.
+    - func (callable): Zero-argument stage; its last result is returned.
+    - repeat (int): Number of runs.
+    - rows_in (int): Input rows of the stage, if meaningful.
+
+    Returns:
+    - object: The result of the last run.
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    entry = {"seconds": seconds, "min": min(seconds), "median": statistics.median(seconds)}
+    if rows_in is not None:
+        entry["rows_in"] = rows_in
+    if isinstance(result, pd.DataFrame):
+        entry["rows_out"] = len(result)
+    results[name] = entry
+    return result
+
+
+def bench_pipeline(inputs, work_dir, years, repeat=3, workers=1, streaming=True):
+    """
+    Time the pipeline stages of processing.py on the generated inputs.
+
+    Stages: ingest_gvc (CSV parse), ingest_co2 (workbook parse), clean,
+    merge (CO2 join), schema (compact types), aggregate (Shiny datasets),
+    write (df.parquet and the dataset CSVs) and, optionally, the end-to-end
+    streaming build.
+
+    Parameters:
+    - inputs (dict): Output of `synthetic.generate`.
+    - work_dir (str): Folder for the written outputs.
+    - years (tuple): Inclusive year range of the inputs.
+    - repeat (int): Runs per stage.
+    - workers (int): Worker processes of the parallel stages.
+    - streaming (bool): Also time `stream_gvc`.
+
+    Returns:
+    - dict: Per stage, the run times and row counts.
+    """
+    results = {}
+    output_dir = os.path.join(work_dir, "output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    df_gvc_original = time_stage(results, "ingest_gvc", lambda: read_gvc_csv(inputs["gvc_path"], cache=False),
+                                 repeat)
+    CO2 = time_stage(results, "ingest_co2", lambda: load_co2(
+        inputs["co2_path"], inputs["countries"], years=years, cache=False, verbose=False, workers=workers
+    ), repeat)
+    df_gvc = time_stage(results, "clean", lambda: clean_gvc(df_gvc_original), repeat,
+                        rows_in=len(df_gvc_original))
+    df_gvc = time_stage(results, "merge", lambda: merge_co2(df_gvc, CO2, verbose=False), repeat,
+                        rows_in=len(df_gvc))
+    df_gvc = time_stage(results, "schema", lambda: apply_schema(df_gvc), repeat, rows_in=len(df_gvc))
+    time_stage(results, "aggregate", lambda: aggregate_datasets(df_gvc, workers=workers)[0], repeat,
+               rows_in=len(df_gvc))
+
+    def write():
+        write_table(df_gvc, output_dir, "df", formats=["parquet"])
+        write_datasets(df_gvc, output_dir, workers=workers)
+    time_stage(results, "write", write, repeat, rows_in=len(df_gvc))
+    results["write"]["bytes"] = sum(os.path.getsize(os.path.join(output_dir, name)) for name in
+                                    ("df.parquet", "processed_data.csv", "aggregated_data.csv"))
+
+    if streaming:
+        stream_dir = os.path.join(work_dir, "stream")
+        os.makedirs(stream_dir, exist_ok=True)
+        time_stage(results, "streaming_build",
+                   lambda: stream_gvc(inputs["gvc_path"], CO2, stream_dir, verbose=False), repeat,
+                   rows_in=inputs["gvc_rows"])
+
+    return results, output_dir
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare the median times of two result files.
+
+    Parameters:
+    - current (dict): Results of this run.
+    - baseline (dict): Results of an earlier run.
+    - threshold (float): Ratio above which a stage counts as a regression.
+
+    Returns:
+    - list: (section, name, baseline median, current median, ratio) of the regressions.
+    """
+    regressions = []
+    for section in ("pipeline", "shiny"):
+        for name, entry in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not before or not before.get("median"):
+                continue
+            ratio = entry["median"] / before["median"]
+            if ratio > threshold:
+                regressions.append((section, name, before["median"], entry["median"], ratio))
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    scale = report["meta"]["scale"]
+    print(f"Scale: {scale['countries']} countries x {scale['industries']} industries x "
+          f"{scale['years'][1] - scale['years'][0] + 1} years ({report['meta']['gvc_rows']:,} GVC rows)")
+    for section in ("pipeline", "shiny"):
+        entries = report.get(section, {})
+        if entries:
+            print(f"{section}:")
+        for name, entry in entries.items():
+            rows = f"  {entry['rows_in']:>12,} rows" if "rows_in" in entry else ""
+            p95 = f"  p95 {entry['p95'] * 1e3:9.2f} ms" if "p95" in entry else ""
+            print(f"  {name:<28} median {entry['median'] * 1e3:10.2f} ms{p95}{rows}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and Shiny callbacks on synthetic data.")
+    parser.add_argument("--countries", type=int, default=42)
+    parser.add_argument("--industries", type=int, default=56)
+    parser.add_argument("--years", type=int, nargs=2, default=[2000, 2014], metavar=("FIRST", "LAST"))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage")
+    parser.add_argument("--workers", type=int, default=1, help="processes of the parallel stages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="result file (JSON)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--work-dir", help="keep the generated inputs and outputs here (default: temporary)")
+    parser.add_argument("--no-streaming", action="store_true", help="skip the streaming build")
+    parser.add_argument("--no-shiny", action="store_true", help="skip the Shiny callbacks")
+    args = parser.parse_args(argv)
+
+    years = tuple(args.years)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="gvc-bench-")
+    try:
+        start = time.perf_counter()
+        inputs = generate(os.path.join(work_dir, "inputs"), countries=args.countries,
+                          industries=args.industries, years=years, seed=args.seed)
+        generate_seconds = time.perf_counter() - start
+
+        pipeline, output_dir = bench_pipeline(inputs, work_dir, years, repeat=args.repeat,
+                                              workers=args.workers, streaming=not args.no_streaming)
+        report = {
+            "meta": {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "scale": {"countries": args.countries, "industries": args.industries, "years": list(years)},
+                "repeat": args.repeat,
+                "workers": args.workers,
+                "gvc_rows": inputs["gvc_rows"],
+                "gvc_bytes": inputs["gvc_bytes"],
+                "co2_bytes": inputs["co2_bytes"],
+                "generate_seconds": generate_seconds,
+            },
+            "pipeline": pipeline,
+        }
+        if not args.no_shiny:
+            report["shiny"] = bench_shiny(output_dir, repeat=args.repeat)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), threshold=args.threshold)
+        for section, name, before, after, ratio in regressions:
+            print(f"REGRESSION {section}/{name}: {before * 1e3:.2f} ms -> {after * 1e3:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than {args.threshold:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
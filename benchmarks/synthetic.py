@@ -0,0 +1,143 @@
+import itertools
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+# Synthetic inputs in the layout of the WIOD files read by src/ingest.py:
+# - the GVC participation CSV (exported row index, "AUS-Country" regions,
+#   "C01 Sector 1" sectors plus the aggregated sectors, GVCpt_* columns)
+# - the CO2 workbook (a Notes sheet, then one sheet per country with the
+#   sector codes in the first column and one "2000", "2001", ... column per year)
+
+# Country codes of the WIOD 2016 release (without NLD), used first
+WIOD_COUNTRIES = ['AUS', 'AUT', 'BEL', 'BGR', 'BRA', 'CAN', 'CHE', 'CHN', 'CYP',
+                  'CZE', 'DEU', 'DNK', 'ESP', 'EST', 'FIN', 'FRA', 'GBR', 'GRC',
+                  'HRV', 'HUN', 'IDN', 'IND', 'IRL', 'ITA', 'JPN', 'KOR', 'LTU',
+                  'LUX', 'LVA', 'MEX', 'MLT', 'NOR', 'POL', 'PRT', 'ROU', 'RUS',
+                  'SVK', 'SVN', 'SWE', 'TUR', 'TWN', 'USA']
+
+AGGREGATED_SECTORS = ['Total', 'goods', 'manufacture', 'all service', 'services related to production']
+
+# Regions of the GVC table without a CO2 sheet (dropped by the pipeline)
+EXTRA_REGIONS = ['NLD', 'ROW']
+
+# Rows per CO2 sheet read by the pipeline (the WIOD sectors)
+CO2_SHEET_ROWS = 56
+
+
+def country_codes(n):
+    """The first `n` country codes: the WIOD countries, then synthetic 'XAA', 'XAB', ..."""
+    reserved = set(WIOD_COUNTRIES) | set(EXTRA_REGIONS)
+    synthetic = (''.join(code) for code in itertools.product('XYZ', string.ascii_uppercase, string.ascii_uppercase))
+    codes = WIOD_COUNTRIES[:n]
+    codes += list(itertools.islice((c for c in synthetic if c not in reserved), max(0, n - len(codes))))
+    return codes
+
+
+def synthetic_gvc(countries, industries=56, years=(2000, 2014), seed=0):
+    """
+    Build a GVC participation table in the layout of the WIOD CSV.
+
+    Parameters:
+    - countries (list): Country codes (the regions in `EXTRA_REGIONS` are added).
+    - industries (int): Number of "Cnn Sector n" sectors per country.
+    - years (tuple): Inclusive (first, last) year range.
+    - seed (int): Random seed.
+
+    Returns:
+    - pd.DataFrame: region, sector, year and the six GVCpt_* columns.
+    """
+    rng = np.random.default_rng(seed)
+    regions = [f"{code}-Country" for code in list(countries) + EXTRA_REGIONS]
+    sectors = [f"C{i:02d} Sector {i}" for i in range(1, industries + 1)] + AGGREGATED_SECTORS
+    year_values = np.arange(years[0], years[1] + 1)
+
+    # Rows ordered by region, year, sector as in the WIOD export
+    n = len(regions) * len(year_values) * len(sectors)
+    df = pd.DataFrame({
+        'region': np.repeat(regions, len(year_values) * len(sectors)),
+        'sector': np.tile(sectors, len(regions) * len(year_values)),
+        'year': np.tile(np.repeat(year_values, len(sectors)), len(regions)),
+    })
+    forward, backward = rng.uniform(0, 0.3, size=(2, n))
+    simple_share, complex_share = rng.uniform(0.2, 0.8, size=(2, n))
+    df['GVCpt_f'] = forward
+    df['GVCpt_f_s'] = forward * simple_share
+    df['GVCpt_f_c'] = forward * (1 - simple_share)
+    df['GVCpt_b'] = backward
+    df['GVCpt_b_s'] = backward * complex_share
+    df['GVCpt_b_c'] = backward * (1 - complex_share)
+    return df
+
+
+def write_gvc_csv(path, countries, industries=56, years=(2000, 2014), seed=0):
+    """Write `synthetic_gvc` as a CSV with the exported row index; returns the row count."""
+    df = synthetic_gvc(countries, industries=industries, years=years, seed=seed)
+    df.to_csv(path)
+    return len(df)
+
+
+def write_co2_workbook(path, countries, years=(2000, 2014), seed=0):
+    """
+    Write a CO2 emissions workbook with one sheet per country.
+
+    Every country sheet has `CO2_SHEET_ROWS` sector rows plus a household
+    row, with the year labels stored as text like in the original workbook.
+
+    Parameters:
+    - path (str): Destination .xlsx file.
+    - countries (list): Country codes (one sheet each).
+    - years (tuple): Inclusive (first, last) year range.
+    - seed (int): Random seed.
+
+    Returns:
+    - int: Number of (country, sector, year) values written.
+    """
+    rng = np.random.default_rng(seed)
+    year_labels = [str(y) for y in range(years[0], years[1] + 1)]
+    codes = [f"S{i:02d}" for i in range(1, CO2_SHEET_ROWS + 1)] + ['FC_HH']
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({'Notes': ['Synthetic CO2 emissions (benchmarks/synthetic.py)']}).to_excel(
+            writer, sheet_name='Notes', index=False
+        )
+        for country in countries:
+            values = rng.lognormal(mean=6, sigma=2, size=(len(codes), len(year_labels)))
+            sheet = pd.DataFrame(values, columns=year_labels)
+            sheet.insert(0, '', codes)
+            sheet.to_excel(writer, sheet_name=country, index=False)
+    return len(countries) * CO2_SHEET_ROWS * len(year_labels)
+
+
+def generate(output_dir, countries=42, industries=56, years=(2000, 2014), seed=0):
+    """
+    Write a synthetic GVC CSV and CO2 workbook at the given scale.
+
+    Parameters:
+    - output_dir (str): Destination folder.
+    - countries (int): Number of countries.
+    - industries (int): Number of GVC sectors per country (the CO2 sheets
+      always hold the 56 WIOD sectors the pipeline reads).
+    - years (tuple): Inclusive (first, last) year range.
+    - seed (int): Random seed.
+
+    Returns:
+    - dict: Paths, row counts and file sizes of the generated inputs.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    codes = country_codes(countries)
+    gvc_path = os.path.join(output_dir, "GVCpt_synthetic.csv")
+    co2_path = os.path.join(output_dir, "CO2_synthetic.xlsx")
+    gvc_rows = write_gvc_csv(gvc_path, codes, industries=industries, years=years, seed=seed)
+    co2_values = write_co2_workbook(co2_path, codes, years=years, seed=seed + 1)
+    return {
+        "countries": codes,
+        "gvc_path": gvc_path,
+        "gvc_rows": gvc_rows,
+        "gvc_bytes": os.path.getsize(gvc_path),
+        "co2_path": co2_path,
+        "co2_values": co2_values,
+        "co2_bytes": os.path.getsize(co2_path),
+    }
@@ -1,19 +1,70 @@
 # shiny run --reload basic-navigation/app.py
+import time
+
+_start = time.perf_counter()
+
 from shiny import App, render, ui, reactive
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.colors import to_rgba
-import geopandas as gpd
+from starlette.routing import Route
 import os
 
+import loaders
+from figure_cache import FigureCache, cached_plot
+from geometry import REGION_EXTENTS
+from metrics import Metrics
+from plots import INDUSTRY_PLOTS, geo_figure, industry_figure, nation_figure
+
+loaders.timings["imports"] = time.perf_counter() - _start
+
 # Loading data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_dir = os.path.abspath(os.path.join(current_dir, "../../data"))
+# Datasets are loaded on first use through the memoized loaders in loaders.py:
+# only the nation data (needed for the country choices) is read at startup,
+# the industry data and the geopandas/shapefile stack wait for their tabs.
+# With several uvicorn workers set SHARED_DATA=1: the tables and geometries
+# are then memory-mapped from data/.shared instead of parsed per worker
+df = loaders.nation_data()
+
+# Per-year slices and presorted CE rankings for the reactive filters
+store = loaders.year_store()
+
+# Member-state geometries, simplified on first use (set GEO_TOLERANCE=0 for full resolution)
+geo_tolerance = float(os.environ.get("GEO_TOLERANCE", 0.05))
+
+# Rendered plot images shared by all sessions of this worker (FIGURE_CACHE_MB, default 64)
+figure_cache = FigureCache(max_bytes=int(os.environ.get("FIGURE_CACHE_MB", 64)) * 1024 * 1024)
+
+# Latency histograms and invalidation counts of every reactive calc and
+# output, served at /metrics (JSON, or ?format=prometheus) together with the
+# figure cache counters; METRICS_LOG=<file> also appends a snapshot per ended
+# session. The numbers are per worker process
+metrics = Metrics(
+    sources={"figure_cache": figure_cache.stats, "loaders": lambda: dict(loaders.timings)},
+    log_path=os.environ.get("METRICS_LOG") or None,
+)
 
-df = pd.read_csv(os.path.join(data_dir, "processed_data.csv"))
-df2 = pd.read_csv(os.path.join(data_dir, "aggregated_data.csv"))
-df_geo = gpd.read_file(os.path.join(data_dir, "world-administrative-boundaries/world-administrative-boundaries.shp"))
+# Rendering backend (PLOT_BACKEND): "matplotlib" renders PNG images on the
+# server, "vega" sends Vega-Lite specs (and the map as a static GeoJSON file)
+# that the browser draws itself
+plot_backend = os.environ.get("PLOT_BACKEND", "matplotlib")
+if plot_backend == "vega":
+    from vega_plots import geo_spec, industry_spec, nation_spec, vega_effect, vega_head, vega_output
+
+    os.makedirs(loaders.vega_dir, exist_ok=True)
+    plot_output = vega_output
+else:
+    plot_output = ui.output_plot
+
+# Optional background pre-rendering of every slider state (WARMUP=1). Images
+# are rendered for the sizes in WARMUP_SIZES (e.g. "geo_plot=1200x400,industry=600x400")
+# and for every new plot size a session reports
+warmup = None
+if os.environ.get("WARMUP") == "1" and plot_backend == "matplotlib":
+    from warmup import Warmup, parse_sizes
+
+    warmup = Warmup(figure_cache, store.years,
+                    workers=int(os.environ.get("WARMUP_WORKERS", 2)), geo_tolerance=geo_tolerance)
+    for output_id, size in parse_sizes(os.environ.get("WARMUP_SIZES", "")):
+        warmup.schedule(output_id, size)
+on_miss = warmup.on_miss if warmup is not None else None
 
 # Define UI
 app_ui = ui.page_navbar(
@@ -22,7 +73,8 @@ app_ui = ui.page_navbar(
         ui.page_fluid(
             ui.h3("Geospatial Plot: Total CO2 Emissions"),
             ui.input_slider("geo_year", "Choose Year:", min=2000, max=2014, value=2000, step=1),
-            ui.output_plot("geo_plot"),
+            ui.input_select("geo_region", "Choose Region:", list(REGION_EXTENTS), selected="World"),
+            plot_output("geo_plot"),
             ui.h4("Top 5 Countries by CO2 Emissions"),
             ui.output_table("top5_table"),
             ui.h4("Bottom 5 Countries by CO2 Emissions"),
@@ -36,13 +88,13 @@ app_ui = ui.page_navbar(
             ui.row(
                 ui.column(
                     6,
-                    ui.input_select("country1", "Choose the first country:", list(df['country'].unique()), selected=df['country'].iloc[0]),
-                    ui.input_select("country3", "Choose the third country:", list(df['country'].unique()), selected=df['country'].iloc[2]),
+                    ui.input_select("country1", "Choose the first country:", store.countries, selected=df['country'].iloc[0]),
+                    ui.input_select("country3", "Choose the third country:", store.countries, selected=df['country'].iloc[2]),
                 ),
                 ui.column(
                     6,
-                    ui.input_select("country2", "Choose the second country:", list(df['country'].unique()), selected=df['country'].iloc[1]),
-                    ui.input_select("country4", "Choose the fourth country:", list(df['country'].unique()), selected=df['country'].iloc[3]),
+                    ui.input_select("country2", "Choose the second country:", store.countries, selected=df['country'].iloc[1]),
+                    ui.input_select("country4", "Choose the fourth country:", store.countries, selected=df['country'].iloc[3]),
                 ),
             ),
             ui.input_radio_buttons(
@@ -56,7 +108,8 @@ app_ui = ui.page_navbar(
                 },
                 selected="average_f",
             ),
-            ui.output_plot("scatter_plot"),
+            ui.input_checkbox("all_countries", "Show all countries", value=False),
+            plot_output("scatter_plot"),
         ),
     ),
     ui.nav_panel(
@@ -71,199 +124,152 @@ app_ui = ui.page_navbar(
                 selected="f",
             ),
             ui.row(
-                ui.column(6, ui.output_plot("agriculture_plot")),
-                ui.column(6, ui.output_plot("manufacturing_plot")),
+                ui.column(6, plot_output("agriculture_plot")),
+                ui.column(6, plot_output("manufacturing_plot")),
             ),
             ui.row(
-                ui.column(6, ui.output_plot("service_plot")),
-                ui.column(6, ui.output_plot("mining_plot")),
+                ui.column(6, plot_output("service_plot")),
+                ui.column(6, plot_output("mining_plot")),
             ),
         ),
     ),
+    header=vega_head() if plot_backend == "vega" else None,
 )
 
+# Vega-Lite specs (serialized JSON) are cached next to the images
+def cached_spec(output_id, key, build):
+    cache_key = (output_id, tuple(key), "vega")
+    spec = figure_cache.get(cache_key)
+    if spec is None:
+        spec = build()
+        figure_cache.put(cache_key, spec)
+    return spec
+
+
+def industry_vega_spec(output_id, key):
+    classification, color = INDUSTRY_PLOTS[output_id]
+
+    def spec():
+        year, participation_type = key()
+        return cached_spec(output_id, (year, participation_type), lambda: industry_spec(
+            store.industry_class(year, classification), classification, color, participation_type
+        ))
+    return spec
+
+
 # Server Logic
 def server(input, output, session):
-    # Filter geoc data based on Member State status and merge
+    metrics.session_started(session)
+
+    # Attach the selected year's CE to the cached member-state geometries of the region
     @reactive.calc
+    @metrics.timed("calc.filtered_geo_data")
     def filtered_geo_data():
-        geo_filtered = df_geo[df_geo['status'] == "Member State"]
-        
-        df_filtered = df[df['year'] == input.geo_year()]
-        
-        merged_data = geo_filtered.merge(
-            df_filtered,
-            left_on="iso3",
-            right_on="country",
-            how="left"
-        )
-        return merged_data
+        geo_index = loaders.geometry_index(geo_tolerance)
+        return geo_index.attach(store.nation_year(input.geo_year()), column="CE", region=input.geo_region())
     
     # Get top 5 countries by total CO2 emissions
     @reactive.calc
+    @metrics.timed("calc.top5_countries_data")
     def top5_countries_data():
-        df_filtered = df[df['year'] == input.geo_year()]
-        top5 = df_filtered.sort_values(by="CE", ascending=False).head(5)
-        return top5[["country", "CE", "average_gvc", "average_gvcs", "average_gvcc", "average_f", "average_b"]]
+        return store.top(input.geo_year(), n=5)
     
     # Get bottom 5 countries by total CO2 emissions
     @reactive.calc
+    @metrics.timed("calc.bottom5_countries_data")
     def bottom5_countries_data():
-        df_filtered = df[df['year'] == input.geo_year()]
-        bottom5 = df_filtered.sort_values(by="CE", ascending=True).head(5)
-        return bottom5[["country", "CE", "average_gvc", "average_gvcs", "average_gvcc", "average_f", "average_b"]]
+        return store.bottom(input.geo_year(), n=5)
     
     # Render a table
+    @metrics.output
     @output
     @render.table
     def top5_table():
         return top5_countries_data()
     
+    @metrics.output
     @output
     @render.table
     def bottom5_table():
         return bottom5_countries_data()
     
-    # Plot
-    @render.plot
-    def geo_plot():
-        data = filtered_geo_data()
-        
-        fig, ax = plt.subplots(1, 1, figsize=(12, 8))
-        data.boundary.plot(ax=ax, linewidth=0.5, color="gray")
-        data.plot(
-            column="CE", 
-            ax=ax,
-            cmap="Blues",
-            legend=True,
-            legend_kwds={'label': "Total CO2 Emissions"},
-            missing_kwds={
-                "color": "lightgrey",
-                "label": "No Data"
-            },
-        )
-        ax.set_title(f"Total CO2 Emissions - {input.geo_year()}", fontsize=16)
-        ax.set_axis_off()
-        return fig
-
     # Filter data for selected nations
     @reactive.calc
+    @metrics.timed("calc.filtered_nation_data")
     def filtered_nation_data():
-        return pd.concat([
-            df[df['country'] == input.country1()],
-            df[df['country'] == input.country2()],
-            df[df['country'] == input.country3()],
-            df[df['country'] == input.country4()],
-        ])
-    
-    # Filter industry data for selected year
-    @reactive.calc
-    def filtered_industry_data():
-        return df2[(df2['year'] == input.year())]
+        if input.all_countries():
+            return df
+        selected = [input.country1(), input.country2(), input.country3(), input.country4()]
+        return df[df['country'].isin(selected)]
+
+    # With all countries shown the figure does not depend on the four country picks
+    def nation_plot_key():
+        if input.all_countries():
+            return ("all", input.participation())
+        return (input.country1(), input.country2(), input.country3(), input.country4(), input.participation())
+
+    # Plot 4 industries (the classification is fixed per output id)
+    def industry_plot_key():
+        return (input.year(), input.participation_type())
+
+    if plot_backend == "vega":
+        # The browser draws the plots; only the (cached) specs are sent
+        vega_effect(session, "geo_plot", metrics.timed("geo_plot")(lambda: cached_spec(
+            "geo_plot", (input.geo_year(), input.geo_region()),
+            lambda: geo_spec(store.nation_year(input.geo_year()), input.geo_year(),
+                             f"vega/{loaders.geojson(geo_tolerance, input.geo_region())}", input.geo_region()),
+        )))
+        vega_effect(session, "scatter_plot", metrics.timed("scatter_plot")(lambda: cached_spec(
+            "scatter_plot", nation_plot_key(),
+            lambda: nation_spec(filtered_nation_data(), input.participation()),
+        )))
+        for output_id in INDUSTRY_PLOTS:
+            vega_effect(session, output_id,
+                        metrics.timed(output_id)(industry_vega_spec(output_id, industry_plot_key)))
+        return
 
     # Plot
-    @render.plot
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=lambda: (input.geo_year(), input.geo_region()), on_miss=on_miss)
+    def geo_plot():
+        return geo_figure(filtered_geo_data(), input.geo_year(), input.geo_region())
+
+    # Plot
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=nation_plot_key)
     def scatter_plot():
-        data = filtered_nation_data()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        for country, group_data in data.groupby('country'):
-            ax.scatter(
-                group_data[input.participation()],
-                group_data['CE'],
-                label=country,
-                s=60,
-                alpha=0.7,
-            )
-            if len(group_data) > 1:
-                z = np.polyfit(group_data[input.participation()], group_data['CE'], 1)
-                p = np.poly1d(z)
-                ax.plot(group_data[input.participation()], p(group_data[input.participation()]), label=f"{country} Trend")
-        ax.set_title("GVC Participation vs CO2 Emissions")
-        ax.set_xlabel("GVC Participation")
-        ax.set_ylabel("Total CO2 Emissions")
-        ax.legend()
-        ax.grid(True)
-        return fig
+        return nation_figure(filtered_nation_data(), input.participation())
 
     # Scatter plots for specific industries
-    def industry_scatter_plot(classification, color):
-        data = filtered_industry_data()
-        class_data = data[data['classification'] == classification]
-
-        highlight_countries = get_highlight_countries(input.participation_type(), classification)
-
-        fig, ax = plt.subplots(figsize=(6, 4))
-        ax.scatter(
-            class_data[input.participation_type()],
-            class_data['CE'],
-            s=50,
-            color=to_rgba(color),
-        )
-
-        for _, row in class_data[class_data['country'].isin(highlight_countries)].iterrows():
-            if not np.isnan(row[input.participation_type()]) and not np.isnan(row['CE']):
-                ax.text(
-                    row[input.participation_type()],
-                    row['CE'],
-                    row['country'],  # Country name as label
-                    fontsize=6,
-                    ha='right',
-                    color='black'
-                )
-
-        ax.set_title(f"{classification}")
-        ax.set_xlabel("Participation")
-        ax.set_ylabel("Total CO2 Emission")
-        ax.set_xlim(0.0, 1.0)
-        ax.grid(True)
-        return fig
-    
-    # Plot 4 industries
-    @render.plot
+    def industry_scatter_plot(output_id):
+        classification, color = INDUSTRY_PLOTS[output_id]
+        class_data = store.industry_class(input.year(), classification)
+        return industry_figure(class_data, classification, color, input.participation_type())
+
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=industry_plot_key, on_miss=on_miss)
     def agriculture_plot():
-        return industry_scatter_plot("Agriculture", color="#FF9999")
+        return industry_scatter_plot("agriculture_plot")
 
-    @render.plot
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=industry_plot_key, on_miss=on_miss)
     def manufacturing_plot():
-        return industry_scatter_plot("Manufacturing", color="#99CCFF")
+        return industry_scatter_plot("manufacturing_plot")
 
-    @render.plot
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=industry_plot_key, on_miss=on_miss)
     def service_plot():
-        return industry_scatter_plot("Service", color="#FFCC99")
+        return industry_scatter_plot("service_plot")
 
-    @render.plot
+    @metrics.output
+    @cached_plot(cache=figure_cache, key=industry_plot_key, on_miss=on_miss)
     def mining_plot():
-        return industry_scatter_plot("Mining", color="#CC99FF")
-    
-    # Get highlighted countries' details
-    def get_highlight_countries(participation_type, classification):
-        highlight_mapping = {
-            "f": {
-                "Agriculture": ["CHN", "USA", "IND"],
-                "Service": ["USA", "CHN", "LUX"],
-                "Manufacturing": ["CHN", "USA", "JPN"],
-                "Mining": ["USA", "CHN", "RUS"],
-            },
-            "b": {
-                "Agriculture": ["CHN", "USA", "IND"],
-                "Service": ["USA", "CHN", "RUS"],
-                "Manufacturing": ["CHN", "USA", "JPN"],
-                "Mining": ["USA", "CHN", "RUS"],
-            },
-            "gvcs": {
-                "Agriculture": ["CHN", "USA", "IND"],
-                "Service": ["USA", "CHN", "RUS", "JPN"],
-                "Manufacturing": ["CHN", "USA", "JPN"],
-                "Mining": ["USA", "CHN", "RUS"],
-            },
-            "gvcc": {
-                "Agriculture": ["CHN", "USA", "IND"],
-                "Service": ["USA", "CHN", "RUS", "JPN"],
-                "Manufacturing": ["CHN", "USA", "JPN"],
-                "Mining": ["USA", "CHN", "RUS"],
-            },
-        }
-        return highlight_mapping.get(participation_type, {}).get(classification, [])
-
-app = App(app_ui, server)
+        return industry_scatter_plot("mining_plot")
+
+app = App(app_ui, server, static_assets={"/vega": loaders.vega_dir} if plot_backend == "vega" else None)
+app.starlette_app.router.routes.insert(0, Route("/metrics", metrics.endpoint, methods=["GET"]))
+
+# Startup timing report
+print(loaders.timing_report("Startup"))
+print(f"  {'total':<45} {time.perf_counter() - _start:7.3f}s")
 
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# Columns shown in the top/bottom 5 tables
+TABLE_COLUMNS = ["country", "CE", "average_gvc", "average_gvcs", "average_gvcc", "average_f", "average_b"]
+
+
+def _row_ranges(df, columns):
+    """
+    Group the rows of a DataFrame by `columns` without copying them.
+
+    Parameters:
+    - df (pd.DataFrame): Data to group.
+    - columns (list): Grouping columns.
+
+    Returns:
+    - tuple: Row positions ordered by group (original order within a group)
+      and a {key: (start, stop)} dict of each group's range in those positions;
+      keys are scalars for a single column and tuples otherwise.
+    """
+    factorized = [pd.factorize(df[column], sort=True) for column in columns]
+    # np.lexsort sorts by its last key first and is stable
+    order = np.lexsort([codes for codes, _ in reversed(factorized)]).astype(np.intp)
+
+    starts = np.zeros(len(order), dtype=bool)
+    starts[:1] = True
+    for codes, _ in factorized:
+        ordered = codes[order]
+        starts[1:] |= ordered[1:] != ordered[:-1]
+    starts = np.flatnonzero(starts)
+    stops = np.append(starts[1:], len(order))
+
+    ranges = {}
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        row = order[start]
+        key = tuple(_plain(uniques[codes[row]]) for codes, uniques in factorized)
+        ranges[key[0] if len(columns) == 1 else key] = (start, stop)
+    return order, ranges
+
+
+def _plain(value):
+    # numpy scalars -> Python scalars, so lookups with plain ints/strings match
+    return value.item() if hasattr(value, "item") else value
+
+
+class YearSliceStore:
+    """
+    Per-year row positions of the Shiny datasets, built once per worker.
+
+    Every reactive filter becomes a dictionary lookup instead of a boolean
+    scan of the full table, and the CE rankings used by the top/bottom 5
+    tables are sorted once per year instead of on every slider move.
+
+    Only integer positions are kept per worker: the rows of each year (and
+    year x classification) are a range of a row ordering, and the rankings
+    are `np.argsort` positions within those ranges. Rows are taken from the
+    (possibly memory-mapped, see shared_data.py) tables when a slice is
+    requested, and only the `n` ranked rows for the top/bottom tables.
+
+    Each dataset may be passed as a DataFrame or as a zero-argument loader;
+    loaders are only called the first time a slice of that dataset is
+    requested, so a tab that is never opened never loads its data.
+
+    Parameters:
+    - df (pd.DataFrame | callable): Nation level data (processed_data.csv).
+    - df2 (pd.DataFrame | callable): Industry level data (aggregated_data.csv).
+    - rank_by (str): Column used for the rankings.
+    """
+
+    def __init__(self, df, df2, rank_by="CE"):
+        self.rank_by = rank_by
+        self._df = df
+        self._df2 = df2
+        self._nation = None
+        self._industry = None
+
+    @staticmethod
+    def _resolve(data):
+        return data() if callable(data) else data
+
+    def _nation_index(self):
+        if self._nation is None:
+            df = self._resolve(self._df)
+            order, ranges = _row_ranges(df, ["year"])
+            values = df[self.rank_by].to_numpy()
+            desc = np.empty_like(order)
+            asc = np.empty_like(order)
+            for start, stop in ranges.values():
+                rows = order[start:stop]
+                # NaN ranks last in both directions, like sort_values
+                desc[start:stop] = rows[np.argsort(-values[rows], kind="stable")]
+                asc[start:stop] = rows[np.argsort(values[rows], kind="stable")]
+            self._nation = {"df": df, "order": order, "year": ranges, "desc": desc, "asc": asc}
+        return self._nation
+
+    def _industry_index(self):
+        if self._industry is None:
+            df2 = self._resolve(self._df2)
+            year_order, year_ranges = _row_ranges(df2, ["year"])
+            class_order, class_ranges = _row_ranges(df2, ["year", "classification"])
+            self._industry = {
+                "df": df2,
+                "year": (year_order, year_ranges),
+                "class": (class_order, class_ranges),
+            }
+        return self._industry
+
+    @staticmethod
+    def _take(df, positions, ranges, key, n=None, columns=None):
+        # Rows of one group (the first `n` only), or an empty frame for an unknown key
+        start, stop = ranges.get(key, (0, 0))
+        if n is not None:
+            stop = min(stop, start + n)
+        rows = df.take(positions[start:stop])
+        if columns is not None:
+            rows = rows[columns]
+        return rows.reset_index(drop=True)
+
+    @property
+    def countries(self):
+        """Countries of the nation level data, in order of appearance."""
+        return list(self._nation_index()["df"]["country"].unique())
+
+    @property
+    def years(self):
+        """Years of the nation level data, ascending."""
+        return [int(year) for year in self._nation_index()["year"]]
+
+    def nation_year(self, year):
+        """Nation level rows for one year."""
+        index = self._nation_index()
+        return self._take(index["df"], index["order"], index["year"], year)
+
+    def top(self, year, n=5, columns=TABLE_COLUMNS):
+        """The `n` countries with the highest CE in `year`."""
+        index = self._nation_index()
+        return self._take(index["df"], index["desc"], index["year"], year, n=n, columns=columns)
+
+    def bottom(self, year, n=5, columns=TABLE_COLUMNS):
+        """The `n` countries with the lowest CE in `year`."""
+        index = self._nation_index()
+        return self._take(index["df"], index["asc"], index["year"], year, n=n, columns=columns)
+
+    def industry_year(self, year):
+        """Industry level rows for one year."""
+        index = self._industry_index()
+        order, ranges = index["year"]
+        return self._take(index["df"], order, ranges, year)
+
+    def industry_class(self, year, classification):
+        """Industry level rows for one year and one industry classification."""
+        index = self._industry_index()
+        order, ranges = index["class"]
+        return self._take(index["df"], order, ranges, (year, classification))
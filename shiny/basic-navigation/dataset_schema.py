@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# Column types of the Shiny datasets: categorical labels, a 2-byte year and
+# float64 metrics (float32 with `float32=True`)
+NATION_DTYPES = {
+    "country": "category",
+    "year": "int16",
+    "CE": "float64",
+    "average_gvc": "float64",
+    "average_gvcs": "float64",
+    "average_gvcc": "float64",
+    "average_f": "float64",
+    "average_b": "float64",
+}
+
+INDUSTRY_DTYPES = {
+    "country": "category",
+    "classification": "category",
+    "year": "int16",
+    "CE": "float64",
+    "f": "float64",
+    "b": "float64",
+    "gvcs": "float64",
+    "gvcc": "float64",
+}
+
+
+def dataset_dtypes(dtypes, float32=False):
+    """Column types with the float64 metrics narrowed to float32 when requested."""
+    if not float32:
+        return dict(dtypes)
+    return {col: "float32" if dtype == "float64" else dtype for col, dtype in dtypes.items()}
+
+
+def read_dataset(path, dtypes, float32=False):
+    """
+    Read a Shiny dataset CSV with its compact schema and validate it.
+
+    Parameters:
+    - path (str): processed_data.csv or aggregated_data.csv.
+    - dtypes (dict): NATION_DTYPES or INDUSTRY_DTYPES.
+    - float32 (bool): Store the metrics as float32.
+
+    Returns:
+    - pd.DataFrame: The dataset with the schema's columns and types.
+
+    Raises:
+    - ValueError: If a column is missing or does not fit its type, or the
+      label and year columns contain missing values.
+    """
+    dtypes = dataset_dtypes(dtypes, float32)
+    # Read the year at full width first so out-of-range values are reported, not wrapped
+    df = pd.read_csv(path, usecols=list(dtypes), dtype={**dtypes, "year": "int64"})[list(dtypes)]
+
+    years = df["year"].to_numpy()
+    info = np.iinfo(dtypes["year"])
+    if len(years) and (years.min() < info.min or years.max() > info.max):
+        raise ValueError(f"{path}: year values outside the {dtypes['year']} range")
+    df["year"] = df["year"].astype(dtypes["year"])
+
+    labels = [col for col, dtype in dtypes.items() if dtype == "category"]
+    if df[labels].isna().any().any():
+        raise ValueError(f"{path}: missing values in {labels}")
+    return df
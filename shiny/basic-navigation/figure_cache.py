@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+
+from shiny import render
+from shiny.session import require_active_session
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of rendered plot images, shared by all sessions of a worker.
+
+    Entries are the PNG payloads produced by `render.plot` (base64 data URI
+    plus size attributes) or serialized Vega-Lite specs (strings). The cache is limited both by total payload bytes
+    and by entry count; the least recently used entries are evicted first.
+
+    Parameters:
+    - max_bytes (int): Upper bound on the summed size of cached images.
+    - max_entries (int): Upper bound on the number of cached images.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(value):
+        if isinstance(value, str):
+            return len(value)
+        return len(value.get("src", "")) if isinstance(value, dict) else 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._size(self._entries.pop(key))
+            self._entries[key] = value
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        # Called from the server thread while warm-up callbacks `put` from executor threads
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current size, e.g. for logging."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class cached_plot(render.plot):
+    """
+    `render.plot` that reuses rendered images from a `FigureCache`.
+
+    The cache key is the output id, the values returned by `key` and the
+    client's plot size and pixel ratio. On a hit the plotting function is not
+    called at all; `key` must therefore read every input the plot depends on,
+    so the output is still invalidated when one of them changes.
+
+    Parameters:
+    - cache (FigureCache): Cache shared across sessions.
+    - key (callable): Zero-argument function returning the relevant input values.
+    - on_miss (callable): Optional `on_miss(output_id, size)` hook, e.g. `Warmup.on_miss`.
+    - **kwargs: Passed on to `render.plot`.
+    """
+
+    def __init__(self, _fn=None, *, cache, key, on_miss=None, **kwargs):
+        self.cache = cache
+        self.key = key
+        self.on_miss = on_miss
+        super().__init__(_fn, **kwargs)
+
+    async def render(self):
+        session = require_active_session(None)
+        output_name = session.ns(self.output_id)
+        inputs = session.root_scope().input
+
+        size = tuple(
+            inputs[f".clientdata_output_{output_name}_{dimension}"]()
+            for dimension in ("width", "height")
+        ) + (inputs[".clientdata_pixelratio"](),)
+        cache_key = (output_name, tuple(self.key()), size)
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if self.on_miss is not None:
+            self.on_miss(output_name, size)
+
+        result = await super().render()
+        if result is not None:
+            self.cache.put(cache_key, result)
+        return result
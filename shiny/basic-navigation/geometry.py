@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pandas as pd
+
+# The region extents and the STRtree selection are shared with the pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../src"))
+from regions import REGION_EXTENTS, select_region
+
+# Default simplification tolerance in degrees (the shapefile is EPSG:4326);
+# 0.05 degrees is well below one pixel on the 12x8 inch world map
+DEFAULT_TOLERANCE = 0.05
+
+
+class GeometryIndex:
+    """
+    Member-state geometries prepared once for the Geo Plot tab.
+
+    The shapefile is filtered to member states and simplified at startup. Each
+    slider step then only attaches a value column to the fixed geometry array
+    through a precomputed country -> row index, instead of filtering and
+    joining the full-resolution GeoDataFrame again.
+
+    Regional maps select their countries with one query of an STRtree built
+    over the geometries and clip them to the region's extent; the subset is
+    kept, so later slider steps of the same region are a dictionary lookup.
+
+    Parameters:
+    - world (gpd.GeoDataFrame): The world administrative boundaries.
+    - tolerance (float): Simplification tolerance in CRS units (0 keeps full resolution).
+    - status (str): Value of the `status` column to keep.
+    """
+
+    def __init__(self, world, tolerance=DEFAULT_TOLERANCE, status="Member State"):
+        import geopandas as gpd
+
+        members = world[world["status"] == status].reset_index(drop=True)
+        geometry = members.geometry
+        if tolerance:
+            geometry = geometry.simplify(tolerance, preserve_topology=True)
+
+        self._init(gpd.GeoDataFrame({"iso3": members["iso3"]}, geometry=geometry, crs=world.crs))
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Wrap already prepared member-state geometries (iso3 and geometry columns)."""
+        index = cls.__new__(cls)
+        index._init(frame)
+        return index
+
+    def _init(self, frame):
+        self.frame = frame
+        self.iso3 = pd.Index(frame["iso3"])
+        self._tree = None
+        self._regions = {"World": (self.frame, self.iso3)}
+
+    def region(self, name):
+        """
+        Member states intersecting a region of `REGION_EXTENTS`, clipped to its extent.
+
+        Parameters:
+        - name (str): Region name.
+
+        Returns:
+        - tuple: (gpd.GeoDataFrame of iso3 and geometry, pd.Index of the iso3 codes).
+        """
+        if name not in self._regions:
+            import shapely
+
+            if self._tree is None:
+                self._tree = shapely.STRtree(self.frame.geometry.values)
+            subset = select_region(self.frame, self._tree, name, clip=True)
+            self._regions[name] = (subset, pd.Index(subset["iso3"]))
+        return self._regions[name]
+
+    def attach(self, data, column="CE", key="country", region="World"):
+        """
+        Attach one value column to the cached geometries.
+
+        Parameters:
+        - data (pd.DataFrame): Rows with one entry per country (e.g. one year of processed_data).
+        - column (str): Column to attach.
+        - key (str): Column of `data` holding the ISO3 country code.
+        - region (str): Region of `REGION_EXTENTS` to draw.
+
+        Returns:
+        - gpd.GeoDataFrame: iso3, geometry and `column` (NaN for countries without data).
+        """
+        geometry, iso3 = self.region(region)
+        positions = pd.Index(data[key]).get_indexer(iso3)
+        values = data[column].to_numpy(dtype=float, na_value=float("nan"))
+
+        frame = geometry.copy(deep=False)
+        frame[column] = pd.Series(values).reindex(positions).to_numpy()
+        return frame
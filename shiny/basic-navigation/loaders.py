@@ -0,0 +1,134 @@
+import functools
+import os
+import time
+
+from dataset_schema import INDUSTRY_DTYPES, NATION_DTYPES, read_dataset
+
+data_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../data"))
+
+# Store the dataset metrics as float32 (DATA_FLOAT32=1); labels are always
+# categorical and years int16, see dataset_schema.py
+float32 = os.environ.get("DATA_FLOAT32", "0") == "1"
+
+# Shared loading mode (SHARED_DATA=1) for multi-worker deployments: the tables
+# and simplified geometries are written once to memory-mapped files under
+# data/.shared and mapped by every worker, see shared_data.py
+shared = os.environ.get("SHARED_DATA", "0") == "1"
+shared_dir = os.path.join(data_dir, ".shared")
+
+nation_path = os.path.join(data_dir, "processed_data.csv")
+industry_path = os.path.join(data_dir, "aggregated_data.csv")
+world_path = os.path.join(data_dir, "world-administrative-boundaries/world-administrative-boundaries.shp")
+
+# Seconds spent in the first call of every loader, in call order
+timings = {}
+
+
+def timed(name):
+    """Record how long the wrapped loader takes under `name` in `timings`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+            return result
+        return wrapper
+    return decorator
+
+
+# Each loader runs once per worker process; later calls return the memoized result
+
+@functools.cache
+@timed("nation data (processed_data.csv)")
+def nation_data():
+    def build():
+        return read_dataset(nation_path, NATION_DTYPES, float32=float32)
+
+    if shared:
+        return _shared().table("nation", [nation_path], build, params={"float32": float32})
+    return build()
+
+
+@functools.cache
+@timed("industry data (aggregated_data.csv)")
+def industry_data():
+    def build():
+        return read_dataset(industry_path, INDUSTRY_DTYPES, float32=float32)
+
+    if shared:
+        return _shared().table("industry", [industry_path], build, params={"float32": float32})
+    return build()
+
+
+@functools.cache
+@timed("world boundaries (geopandas + shapefile)")
+def world_boundaries():
+    # geopandas/shapely are only imported when the Geo tab is first drawn
+    import geopandas as gpd
+    return gpd.read_file(world_path)
+
+
+@functools.cache
+def geometry_index(tolerance):
+    if shared:
+        return _shared_geometry_index(tolerance)
+    return _build_geometry_index(world_boundaries(), tolerance)
+
+
+@timed("geometry index (filter + simplify)")
+def _build_geometry_index(world, tolerance):
+    from geometry import GeometryIndex
+    return GeometryIndex(world, tolerance=tolerance)
+
+
+@timed("geometry index (shared memory map)")
+def _shared_geometry_index(tolerance):
+    from geometry import GeometryIndex
+
+    # The shapefile is only read (and simplified) by the worker that builds the shared file
+    sources = [os.path.splitext(world_path)[0] + ext for ext in (".shp", ".shx", ".dbf", ".prj")]
+    frame = _shared().geometry(
+        f"geometry-{tolerance}", [p for p in sources if os.path.exists(p)],
+        lambda: _build_geometry_index(world_boundaries(), tolerance).frame,
+        params={"tolerance": tolerance},
+    )
+    return GeometryIndex.from_frame(frame)
+
+
+# Static files of the vega backend (served under /vega by the app)
+vega_dir = os.path.join(shared_dir, "vega")
+
+
+@functools.cache
+@timed("map GeoJSON (vega backend)")
+def geojson(tolerance, region="World"):
+    from vega_plots import write_geojson
+
+    # Written once per worker and region; every worker writes the same content atomically
+    name = f"countries-{tolerance}-{region.lower()}.json"
+    os.makedirs(vega_dir, exist_ok=True)
+    frame, _ = geometry_index(tolerance).region(region)
+    write_geojson(frame, os.path.join(vega_dir, name))
+    return name
+
+
+@functools.cache
+def _shared():
+    from shared_data import SharedData
+    return SharedData(shared_dir)
+
+
+@functools.cache
+def year_store():
+    from data_store import YearSliceStore
+    return YearSliceStore(nation_data, industry_data)
+
+
+def timing_report(title="Data loading"):
+    """Format the recorded loader timings, one line per loader."""
+    lines = [f"{title}:"]
+    lines += [f"  {name:<45} {seconds:7.3f}s" for name, seconds in timings.items()]
+    if not timings:
+        lines.append("  (nothing loaded yet)")
+    return "\n".join(lines)
@@ -0,0 +1,249 @@
+import bisect
+import functools
+import json
+import re
+import threading
+import time
+from collections import deque
+
+# Latency and invalidation counters of the app's reactive calcs and outputs,
+# per worker process. Calcs are timed by wrapping their function
+# (`metrics.timed`), outputs by wrapping the renderer (`metrics.output`), so
+# an output's latency also covers figure-cache lookups and PNG encoding.
+# The numbers are served as JSON (or Prometheus text with ?format=prometheus)
+# by `metrics.endpoint`, mounted at /metrics by app.py, and optionally
+# appended to a JSON-lines log whenever a session ends.
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is +Inf)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Most recent latencies kept per name for the percentiles
+WINDOW = 1024
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram plus a window of recent samples.
+
+    Parameters:
+    - window (int): Number of recent latencies kept for the percentiles.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1e3)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        """Latency (seconds) at quantile `q` of the recent window, None when empty."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total / self.count * 1e3 if self.count else None,
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": self.max * 1e3,
+            "buckets_ms": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1e3
+
+
+def _silent(error):
+    # `req()` and unset inputs stop an output without being an error
+    from shiny.types import SilentCancelOutputException, SilentException
+
+    return isinstance(error, (SilentException, SilentCancelOutputException))
+
+
+def _on_invalidate(callback):
+    # Count the invalidation of the reactive context running the timed code
+    from shiny.reactive import get_current_context
+
+    try:
+        get_current_context().on_invalidate(callback)
+    except RuntimeError:
+        pass
+
+
+class Metrics:
+    """
+    Registry of per-name latency histograms, run and invalidation counts.
+
+    Names are "calc.<name>" for reactive calcs and the output id for outputs.
+    Invalidations count every time the inputs of a calc or output changed
+    after it ran (an output is also invalidated once when its session ends).
+
+    Parameters:
+    - sources (dict): Extra zero-argument callables whose results are added
+      to the snapshot, e.g. {"figure_cache": figure_cache.stats}.
+    - log_path (str): JSON-lines file receiving a snapshot at every session
+      end (None disables the log).
+    """
+
+    def __init__(self, sources=None, log_path=None):
+        self.sources = dict(sources or {})
+        self.log_path = log_path
+        self.started = time.time()
+        self.histograms = {}
+        self.invalidations = {}
+        self.errors = {}
+        self.sessions = {"started": 0, "ended": 0}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, failed=False):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            self.histograms[name].observe(seconds)
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def invalidated(self, name):
+        with self._lock:
+            self.invalidations[name] = self.invalidations.get(name, 0) + 1
+
+    def session_started(self, session):
+        """Count a session and its end (call from the server function)."""
+        with self._lock:
+            self.sessions["started"] += 1
+
+        def ended():
+            with self._lock:
+                self.sessions["ended"] += 1
+            if self.log_path:
+                self.write_log()
+        session.on_ended(ended)
+
+    def write_log(self):
+        """Append the current snapshot to `log_path` as one JSON line."""
+        snapshot = self.snapshot()
+        snapshot["time"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock, open(self.log_path, "a") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+    def timed(self, name):
+        """
+        Decorator timing a reactive calc's function (place it below `@reactive.calc`).
+
+        Parameters:
+        - name (str): Metric name, e.g. "calc.filtered_geo_data".
+
+        Returns:
+        - callable: Decorator.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                _on_invalidate(lambda: self.invalidated(name))
+                start = time.perf_counter()
+                failed = False
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    failed = not _silent(e)
+                    raise
+                finally:
+                    self.observe(name, time.perf_counter() - start, failed=failed)
+            return wrapper
+        return decorator
+
+    def output(self, renderer):
+        """
+        Time every render of an output, cache hits included (outermost decorator).
+
+        Parameters:
+        - renderer (Renderer): A `render.*` or `cached_plot` output.
+
+        Returns:
+        - Renderer: The same renderer, its `render` wrapped.
+        """
+        render = renderer.render
+
+        async def timed_render():
+            name = renderer.output_id
+            _on_invalidate(lambda: self.invalidated(name))
+            start = time.perf_counter()
+            failed = False
+            try:
+                return await render()
+            except Exception as e:
+                failed = not _silent(e)
+                raise
+            finally:
+                self.observe(name, time.perf_counter() - start, failed=failed)
+
+        renderer.render = timed_render
+        return renderer
+
+    def snapshot(self):
+        """All counters as a JSON-serializable dict."""
+        with self._lock:
+            outputs = {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+            for name, summary in outputs.items():
+                summary["invalidations"] = self.invalidations.get(name, 0)
+                summary["errors"] = self.errors.get(name, 0)
+            sessions = dict(self.sessions)
+        sessions["active"] = sessions["started"] - sessions["ended"]
+        snapshot = {"uptime_s": time.time() - self.started, "sessions": sessions, "latency": outputs}
+        for key, source in self.sources.items():
+            snapshot[key] = source()
+        return snapshot
+
+    def prometheus(self):
+        """The latency histograms and counters in the Prometheus text format."""
+        snapshot = self.snapshot()
+        lines = ["# TYPE shiny_render_seconds histogram"]
+        for name, summary in snapshot["latency"].items():
+            cumulative = 0
+            for bound, count in summary["buckets_ms"].items():
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{float(bound) / 1e3:g}"
+                lines.append(f'shiny_render_seconds_bucket{{name="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'shiny_render_seconds_sum{{name="{name}"}} {summary["total_s"]:g}')
+            lines.append(f'shiny_render_seconds_count{{name="{name}"}} {summary["count"]}')
+        lines.append("# TYPE shiny_invalidations_total counter")
+        for name, summary in snapshot["latency"].items():
+            lines.append(f'shiny_invalidations_total{{name="{name}"}} {summary["invalidations"]}')
+        lines.append("# TYPE shiny_sessions gauge")
+        lines.append(f'shiny_sessions{{state="active"}} {snapshot["sessions"]["active"]}')
+        for key, value in snapshot.items():
+            if isinstance(value, dict) and key not in ("latency", "sessions"):
+                for field, number in value.items():
+                    if isinstance(number, (int, float)):
+                        lines.append(f"shiny_{re.sub(r'[^a-zA-Z0-9_]', '_', f'{key}_{field}')} {number:g}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """One line per name: count, p50/p95/max latency and invalidations."""
+        lines = [f"{'name':<32} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'invalid.':>9}"]
+        for name, summary in self.snapshot()["latency"].items():
+            lines.append(f"{name:<32} {summary['count']:>7} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                         f"{summary['max_ms']:>9.1f} {summary['invalidations']:>9}")
+        return "\n".join(lines)
+
+    async def endpoint(self, request):
+        """Starlette handler serving the snapshot (JSON, or ?format=prometheus)."""
+        from starlette.responses import PlainTextResponse, Response
+
+        if request.query_params.get("format") == "prometheus":
+            return PlainTextResponse(self.prometheus(), media_type="text/plain; version=0.0.4")
+        return Response(json.dumps(self.snapshot(), indent=2), media_type="application/json")
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from regression import fit_trend_lines
+
+# matplotlib is imported inside the figure builders so that importing this
+# module (and the app) does not pay for pyplot before the first plot is drawn
+
+# Industry plot outputs: output id -> (classification, color)
+INDUSTRY_PLOTS = {
+    "agriculture_plot": ("Agriculture", "#FF9999"),
+    "manufacturing_plot": ("Manufacturing", "#99CCFF"),
+    "service_plot": ("Service", "#FFCC99"),
+    "mining_plot": ("Mining", "#CC99FF"),
+}
+
+# Choices of the Industry Level "participation_type" radio buttons
+PARTICIPATION_TYPES = ["f", "b", "gvcs", "gvcc"]
+
+# Above this many countries the Nation Level plot is drawn without a legend
+MAX_LEGEND_COUNTRIES = 10
+
+
+def geo_title(year, region="World"):
+    """Title of the Geo Plot map."""
+    if region == "World":
+        return f"Total CO2 Emissions - {year}"
+    return f"Total CO2 Emissions ({region}) - {year}"
+
+
+def geo_figure(data, year, region="World"):
+    """Choropleth of total CO2 emissions for one year (`data` from `GeometryIndex.attach`)."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+    # Draw fills and gray boundaries in a single pass
+    data.plot(
+        column="CE",
+        ax=ax,
+        cmap="Blues",
+        edgecolor="gray",
+        linewidth=0.5,
+        legend=True,
+        legend_kwds={'label': "Total CO2 Emissions"},
+        missing_kwds={
+            "color": "lightgrey",
+            "edgecolor": "gray",
+            "label": "No Data"
+        },
+    )
+    ax.set_title(geo_title(year, region), fontsize=16)
+    ax.set_axis_off()
+    return fig
+
+
+def nation_figure(data, participation):
+    """Scatter of a participation measure against CE with one trend line per country."""
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    codes, countries = pd.factorize(data['country'], sort=True)
+    colors = country_colors(len(countries))
+    lines = fit_trend_lines(data, participation, 'CE').reindex(countries)
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.scatter(
+        data[participation],
+        data['CE'],
+        c=colors[codes],
+        s=60,
+        alpha=0.7,
+    )
+
+    # All trend lines as one collection, each spanning its country's x range
+    fitted = lines['slope'].notna().to_numpy()
+    x_ends = lines[['x_min', 'x_max']].to_numpy()[fitted]
+    y_ends = x_ends * lines['slope'].to_numpy()[fitted, None] + lines['intercept'].to_numpy()[fitted, None]
+    ax.add_collection(LineCollection(np.stack([x_ends, y_ends], axis=-1), colors=colors[fitted]))
+
+    # A legend only stays readable for a handful of countries
+    if len(countries) <= MAX_LEGEND_COUNTRIES:
+        handles = [
+            Line2D([], [], marker='o', linestyle='-' if has_line else '', color=color, label=country)
+            for country, color, has_line in zip(countries, colors, fitted)
+        ]
+        ax.legend(handles=handles)
+    ax.set_title("GVC Participation vs CO2 Emissions")
+    ax.set_xlabel("GVC Participation")
+    ax.set_ylabel("Total CO2 Emissions")
+    ax.grid(True)
+    return fig
+
+
+def country_colors(n):
+    """`n` distinct RGBA colors: the default color cycle, or a spectral colormap for many countries."""
+    from matplotlib import colormaps
+    from matplotlib import pyplot as plt
+    from matplotlib.colors import to_rgba_array
+
+    cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    if n <= len(cycle):
+        return to_rgba_array(cycle[:n]) if n else np.empty((0, 4))
+    return colormaps['nipy_spectral'](np.linspace(0.0, 0.95, n))
+
+
+def industry_figure(class_data, classification, color, participation_type):
+    """Scatter of one industry classification with the highlighted countries labelled."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba
+
+    highlight_countries = get_highlight_countries(participation_type, classification)
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.scatter(
+        class_data[participation_type],
+        class_data['CE'],
+        s=50,
+        color=to_rgba(color),
+    )
+
+    for _, row in class_data[class_data['country'].isin(highlight_countries)].iterrows():
+        if not np.isnan(row[participation_type]) and not np.isnan(row['CE']):
+            ax.text(
+                row[participation_type],
+                row['CE'],
+                row['country'],  # Country name as label
+                fontsize=6,
+                ha='right',
+                color='black'
+            )
+
+    ax.set_title(f"{classification}")
+    ax.set_xlabel("Participation")
+    ax.set_ylabel("Total CO2 Emission")
+    ax.set_xlim(0.0, 1.0)
+    ax.grid(True)
+    return fig
+
+
+# Get highlighted countries' details
+def get_highlight_countries(participation_type, classification):
+    highlight_mapping = {
+        "f": {
+            "Agriculture": ["CHN", "USA", "IND"],
+            "Service": ["USA", "CHN", "LUX"],
+            "Manufacturing": ["CHN", "USA", "JPN"],
+            "Mining": ["USA", "CHN", "RUS"],
+        },
+        "b": {
+            "Agriculture": ["CHN", "USA", "IND"],
+            "Service": ["USA", "CHN", "RUS"],
+            "Manufacturing": ["CHN", "USA", "JPN"],
+            "Mining": ["USA", "CHN", "RUS"],
+        },
+        "gvcs": {
+            "Agriculture": ["CHN", "USA", "IND"],
+            "Service": ["USA", "CHN", "RUS", "JPN"],
+            "Manufacturing": ["CHN", "USA", "JPN"],
+            "Mining": ["USA", "CHN", "RUS"],
+        },
+        "gvcc": {
+            "Agriculture": ["CHN", "USA", "IND"],
+            "Service": ["USA", "CHN", "RUS", "JPN"],
+            "Manufacturing": ["CHN", "USA", "JPN"],
+            "Mining": ["USA", "CHN", "RUS"],
+        },
+    }
+    return highlight_mapping.get(participation_type, {}).get(classification, [])
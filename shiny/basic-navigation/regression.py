@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+
+def fit_trend_lines(data, x, y, by="country"):
+    """
+    Fit a least-squares line y = slope * x + intercept for every group at once.
+
+    Instead of calling `np.polyfit` per group, the grouped sums (n, Σx, Σy and
+    the centered Σxy, Σx²) are accumulated with `np.bincount` over the group
+    codes, so the cost is a few vectorized passes regardless of how many
+    groups (countries) are selected. Rows with a missing x or y are ignored,
+    like they would make `np.polyfit` fail.
+
+    Parameters:
+    - data (pd.DataFrame): Rows to fit.
+    - x (str): Column with the explanatory variable (e.g. "average_f").
+    - y (str): Column with the response (e.g. "CE").
+    - by (str): Group column.
+
+    Returns:
+    - pd.DataFrame: One row per group (index `by`, in sorted order) with n,
+      slope, intercept, x_min and x_max. Groups with fewer than two points or
+      no spread in x get NaN slope and intercept.
+    """
+    valid = data[[by, x, y]].dropna(subset=[x, y])
+    codes, groups = pd.factorize(valid[by], sort=True)
+    xs = valid[x].to_numpy(dtype=float)
+    ys = valid[y].to_numpy(dtype=float)
+    k = len(groups)
+
+    n = np.bincount(codes, minlength=k).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.bincount(codes, weights=xs, minlength=k) / n
+        y_mean = np.bincount(codes, weights=ys, minlength=k) / n
+
+        # Centering first keeps the sums well conditioned (x is a share, y is in kt)
+        dx = xs - x_mean[codes]
+        dy = ys - y_mean[codes]
+        sxx = np.bincount(codes, weights=dx * dx, minlength=k)
+        sxy = np.bincount(codes, weights=dx * dy, minlength=k)
+
+        slope = np.where((n > 1) & (sxx > 0), sxy / sxx, np.nan)
+    intercept = y_mean - slope * x_mean
+
+    x_min = np.full(k, np.nan)
+    x_max = np.full(k, np.nan)
+    np.fmin.at(x_min, codes, xs)
+    np.fmax.at(x_max, codes, xs)
+
+    return pd.DataFrame(
+        {"n": n.astype(int), "slope": slope, "intercept": intercept, "x_min": x_min, "x_max": x_max},
+        index=pd.Index(groups, name=by),
+    )
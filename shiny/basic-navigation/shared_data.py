@@ -0,0 +1,188 @@
+import fcntl
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Bump when the file layout changes so stale shared files are rebuilt
+SHARED_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+
+def source_fingerprint(paths):
+    """Size and modification time of every source file, used to detect stale shared files."""
+    return {os.path.basename(p): [os.path.getsize(p), os.stat(p).st_mtime_ns] for p in paths}
+
+
+class SharedData:
+    """
+    Datasets written once to memory-mapped files and opened zero-copy by every worker.
+
+    Tables are stored as uncompressed Arrow IPC files and geometries as NumPy
+    coordinate/offset arrays. Every worker maps the same files, so the pages
+    of the numeric columns and coordinates live once in the OS page cache
+    instead of once per worker, and a new worker starts without parsing CSV
+    files or the shapefile.
+
+    The first worker that finds a file missing or stale (its sources changed)
+    builds it under an exclusive file lock; the others wait and then map the
+    result. Files are replaced atomically, so workers that still map an older
+    version keep a valid mapping.
+
+    Parameters:
+    - shared_dir (str): Folder holding the shared files (e.g. data/.shared).
+    """
+
+    def __init__(self, shared_dir):
+        self.shared_dir = shared_dir
+
+    def table(self, name, sources, build, params=None):
+        """
+        Map a shared table, building it first when needed.
+
+        Parameters:
+        - name (str): File name without extension (e.g. "nation").
+        - sources (list): Input files the table is built from.
+        - build (callable): Returns the DataFrame to share (numeric, integer
+          and categorical columns).
+        - params (dict): Build options that change the content (e.g. float32).
+
+        Returns:
+        - pd.DataFrame: The table; numeric columns are views of the mapped file.
+        """
+        path = os.path.join(self.shared_dir, f"{name}.arrow")
+        self._ensure(name, sources, params, lambda: [path], lambda: _write_table(build(), path))
+        return _map_table(path)
+
+    def geometry(self, name, sources, build, params=None):
+        """
+        Map shared (multi)polygon geometries, building them first when needed.
+
+        Parameters:
+        - name (str): File name prefix (e.g. "geometry-0.05").
+        - sources (list): Input files the geometries are built from.
+        - build (callable): Returns a GeoDataFrame with an `iso3` column.
+        - params (dict): Build options that change the content (e.g. tolerance).
+
+        Returns:
+        - gpd.GeoDataFrame: iso3 and geometry, rebuilt from the mapped coordinates.
+        """
+        base = os.path.join(self.shared_dir, name)
+        self._ensure(name, sources, params, lambda: _geometry_paths(base), lambda: _write_geometry(build(), base))
+        return _map_geometry(base)
+
+    def _ensure(self, name, sources, params, paths, write):
+        entry = {"version": SHARED_VERSION, "sources": source_fingerprint(sources), "params": params or {}}
+        if self._is_current(name, entry, paths):
+            return
+
+        os.makedirs(self.shared_dir, exist_ok=True)
+        with open(os.path.join(self.shared_dir, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another worker may have built it while we waited for the lock
+                if self._is_current(name, entry, paths):
+                    return
+                write()
+                manifest = self._manifest()
+                manifest[name] = entry
+                _write_json(manifest, os.path.join(self.shared_dir, MANIFEST_NAME))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _is_current(self, name, entry, paths):
+        # `paths` is called on every check, as the file list can depend on files another worker wrote
+        return self._manifest().get(name) == entry and all(os.path.exists(p) for p in paths())
+
+    def _manifest(self):
+        path = os.path.join(self.shared_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+
+def _write_json(data, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _write_table(df, path):
+    arrays = []
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            arrays.append(pa.DictionaryArray.from_arrays(
+                codes, pa.array(values.cat.categories.astype(str)), mask=codes < 0
+            ))
+        else:
+            # Plain NumPy arrays keep NaN as a value (no validity bitmap), so
+            # the columns can be mapped back without a copy
+            arrays.append(pa.array(values.to_numpy()))
+    table = pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _map_table(path):
+    # The mapping stays open as long as the buffers (and the DataFrame columns) reference it
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_geometry(frame, base):
+    import shapely
+
+    geometry_type, coords, offsets = shapely.to_ragged_array(frame.geometry.values)
+    meta = {
+        "geometry_type": int(geometry_type),
+        "crs": frame.crs.to_wkt() if frame.crs is not None else None,
+        "offsets": len(offsets),
+    }
+
+    # Coordinates and offsets as .npy files (mapped with np.load(mmap_mode="r")),
+    # the iso3 codes as a one-column table
+    for i, values in enumerate([coords, *offsets]):
+        target = f"{base}.coords.npy" if i == 0 else f"{base}.offsets{i - 1}.npy"
+        tmp = f"{target}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.ascontiguousarray(values))
+        os.replace(tmp, target)
+    _write_table(pd.DataFrame({"iso3": pd.Categorical(frame["iso3"])}), f"{base}.arrow")
+    _write_json(meta, f"{base}.json")
+
+
+def _geometry_paths(base):
+    # Every file `_map_geometry` opens; the number of offsets arrays is in the
+    # meta file (written last), so without it the entry is incomplete anyway
+    paths = [f"{base}.arrow", f"{base}.coords.npy", f"{base}.json"]
+    try:
+        with open(f"{base}.json") as f:
+            count = json.load(f)["offsets"]
+    except (OSError, ValueError, KeyError):
+        return paths
+    return paths + [f"{base}.offsets{i}.npy" for i in range(count)]
+
+
+def _map_geometry(base):
+    import geopandas as gpd
+    import shapely
+
+    with open(f"{base}.json") as f:
+        meta = json.load(f)
+    coords = np.load(f"{base}.coords.npy", mmap_mode="r")
+    offsets = tuple(np.load(f"{base}.offsets{i}.npy", mmap_mode="r") for i in range(meta["offsets"]))
+
+    # GEOS keeps its own copy of the coordinates; building it from the mapped
+    # arrays skips reading and simplifying the shapefile
+    geometry = shapely.from_ragged_array(shapely.GeometryType(meta["geometry_type"]), coords, offsets)
+    iso3 = _map_table(f"{base}.arrow")["iso3"].astype(str)
+    return gpd.GeoDataFrame({"iso3": iso3}, geometry=geometry, crs=meta["crs"])
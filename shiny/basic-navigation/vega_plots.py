@@ -0,0 +1,174 @@
+import json
+import os
+
+import numpy as np
+
+from plots import MAX_LEGEND_COUNTRIES, geo_title, get_highlight_countries
+
+# Client-side rendering backend (PLOT_BACKEND=vega): outputs send Vega-Lite
+# specs built with Altair and the browser draws them with vega-embed, so the
+# server never rasterizes a figure. altair is imported inside the builders.
+
+# vega-embed and its dependencies, matching the Vega-Lite version of Altair 5
+VEGA_SCRIPTS = [
+    "https://cdn.jsdelivr.net/npm/vega@5",
+    "https://cdn.jsdelivr.net/npm/vega-lite@5",
+    "https://cdn.jsdelivr.net/npm/vega-embed@6",
+]
+
+# Custom message handler drawing a spec into the div with the output id
+EMBED_HANDLER = """
+Shiny.addCustomMessageHandler("vega-embed", function(message) {
+  vegaEmbed("#" + message.id, JSON.parse(message.spec), {actions: false, renderer: "svg"});
+});
+// Charts drawn in a hidden tab have no width yet; resizing makes
+// "container" sized charts pick up the width once their tab is shown
+$(document).on("shown.bs.tab", function() {
+  window.dispatchEvent(new Event("resize"));
+});
+"""
+
+# Coordinate precision of the exported map (3 decimals is ~100 m)
+GEOJSON_PRECISION = 3
+
+
+def vega_head():
+    """Head content loading vega-embed and the message handler."""
+    from shiny import ui
+
+    return ui.head_content(
+        *[ui.tags.script(src=src) for src in VEGA_SCRIPTS],
+        ui.tags.script(EMBED_HANDLER),
+    )
+
+
+def vega_output(output_id, height="420px"):
+    """Placeholder the browser draws the output's spec into (replaces `ui.output_plot`)."""
+    from shiny import ui
+
+    return ui.div(id=output_id, style=f"width: 100%; min-height: {height};")
+
+
+def vega_effect(session, output_id, spec):
+    """
+    Send an output's spec to the browser whenever its inputs change.
+
+    Parameters:
+    - session (Session): The Shiny session.
+    - output_id (str): Id of the `vega_output` placeholder.
+    - spec (callable): Zero-argument function returning the serialized spec;
+      the reactive inputs it reads decide when the output is redrawn.
+
+    Returns:
+    - reactive.Effect: The registered effect.
+    """
+    from shiny import reactive
+
+    @reactive.effect
+    async def _send():
+        await session.send_custom_message("vega-embed", {"id": session.ns(output_id), "spec": spec()})
+
+    return _send
+
+
+def write_geojson(frame, path, precision=GEOJSON_PRECISION):
+    """
+    Export the member-state geometries as a GeoJSON file served to the browser.
+
+    The map geometry never changes, so it is fetched (and cached) by the
+    browser once; the per-year specs then only carry the iso3 -> CE values.
+
+    Parameters:
+    - frame (gpd.GeoDataFrame): iso3 and geometry (e.g. `GeometryIndex.frame`).
+    - path (str): Destination file.
+    - precision (int): Decimals kept in the coordinates.
+
+    Returns:
+    - str: `path`.
+    """
+    import shapely
+
+    geometry = shapely.set_precision(frame.geometry.values, 10.0 ** -precision)
+    features = [
+        {"type": "Feature", "properties": {"iso3": iso3}, "geometry": json.loads(shapely.to_geojson(geom))}
+        for iso3, geom in zip(frame["iso3"], geometry)
+        if geom is not None and not geom.is_empty
+    ]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def geo_spec(data, year, geojson_url, region="World"):
+    """Choropleth spec (JSON) of total CO2 emissions for one year (`data`: one year of the nation data)."""
+    import altair as alt
+
+    values = _records(data, ["country", "CE"])
+    shapes = alt.Data(url=geojson_url, format=alt.DataFormat(property="features", type="json"))
+    chart = alt.Chart(shapes).mark_geoshape(stroke="gray", strokeWidth=0.5).transform_lookup(
+        lookup="properties.iso3",
+        from_=alt.LookupData(alt.InlineData(values=values), key="country", fields=["CE"]),
+    ).encode(
+        color=alt.condition(
+            "isValid(datum.CE)",
+            alt.Color("CE:Q", scale=alt.Scale(scheme="blues"), title="Total CO2 Emissions"),
+            alt.value("lightgrey"),
+        ),
+        tooltip=[alt.Tooltip("properties.iso3:N", title="Country"), alt.Tooltip("CE:Q", format=",.0f")],
+    ).project("equirectangular").properties(
+        title=geo_title(year, region), width="container", height=400
+    )
+    return chart.to_json(indent=None)
+
+
+def nation_spec(data, participation):
+    """Scatter spec (JSON) of a participation measure against CE, with per-country trend lines fitted in the browser."""
+    import altair as alt
+
+    countries = sorted(data["country"].astype(str).unique())
+    legend = alt.Legend() if len(countries) <= MAX_LEGEND_COUNTRIES else None
+    base = alt.Chart(alt.InlineData(values=_records(data, ["country", participation, "CE"]))).encode(
+        x=alt.X(f"{participation}:Q", title="GVC Participation", scale=alt.Scale(zero=False)),
+        y=alt.Y("CE:Q", title="Total CO2 Emissions"),
+        color=alt.Color("country:N", legend=legend, scale=alt.Scale(domain=countries)),
+    )
+    points = base.mark_circle(size=60, opacity=0.7).encode(tooltip=["country:N", f"{participation}:Q", "CE:Q"])
+    lines = base.transform_regression(participation, "CE", groupby=["country"]).mark_line()
+    chart = (points + lines).properties(title="GVC Participation vs CO2 Emissions", width="container", height=300)
+    return chart.to_json(indent=None)
+
+
+def industry_spec(class_data, classification, color, participation_type):
+    """Scatter spec (JSON) of one industry classification with the highlighted countries labelled."""
+    import altair as alt
+
+    highlight = get_highlight_countries(participation_type, classification)
+    records = _records(class_data, ["country", participation_type, "CE"])
+    for record in records:
+        record["label"] = record["country"] if record["country"] in highlight else ""
+
+    base = alt.Chart(alt.InlineData(values=records)).encode(
+        x=alt.X(f"{participation_type}:Q", title="Participation", scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y("CE:Q", title="Total CO2 Emission"),
+    )
+    points = base.mark_circle(size=50, color=color, opacity=1).encode(
+        tooltip=["country:N", f"{participation_type}:Q", "CE:Q"]
+    )
+    labels = base.mark_text(align="right", dx=-3, fontSize=8, color="black").encode(text="label:N")
+    chart = (points + labels).properties(title=classification, width="container", height=300)
+    return chart.to_json(indent=None)
+
+
+def _records(data, columns):
+    # JSON-ready rows: plain strings for labels and None instead of NaN
+    rows = data[columns]
+    out = {}
+    for col in columns:
+        values = rows[col].to_numpy(dtype=object if col == "country" else float)
+        if col == "country":
+            out[col] = [str(v) for v in values]
+        else:
+            out[col] = [None if np.isnan(v) else float(v) for v in values]
+    return [dict(zip(columns, row)) for row in zip(*(out[col] for col in columns))]
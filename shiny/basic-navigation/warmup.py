@@ -0,0 +1,201 @@
+import atexit
+import base64
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from plots import INDUSTRY_PLOTS, PARTICIPATION_TYPES, geo_figure, industry_figure
+
+# Data held by each pool worker, loaded once by `_init_worker`
+_worker = {}
+
+
+def _init_worker(geo_tolerance):
+    # matplotlib is not thread-safe, so rendering happens in separate processes
+    # that each own a headless backend and their own copy of the data
+    import matplotlib
+    matplotlib.use("Agg")
+
+    import loaders
+
+    _worker["store"] = loaders.year_store()
+    _worker["geo_index"] = loaders.geometry_index(geo_tolerance)
+
+
+def build_figure(output_id, key, store, geo_index):
+    """
+    Build the figure an output shows for a given cache key.
+
+    Parameters:
+    - output_id (str): "geo_plot" or one of the `INDUSTRY_PLOTS` ids.
+    - key (tuple): (geo_year, geo_region) for the map, (year, participation_type) for industry plots.
+    - store (YearSliceStore): Per-year data slices.
+    - geo_index (GeometryIndex): Cached member-state geometries.
+
+    Returns:
+    - matplotlib.figure.Figure: The unrendered figure.
+    """
+    if output_id == "geo_plot":
+        year, region = key
+        return geo_figure(geo_index.attach(store.nation_year(year), column="CE", region=region), year, region)
+
+    year, participation_type = key
+    classification, color = INDUSTRY_PLOTS[output_id]
+    return industry_figure(store.industry_class(year, classification), classification, color, participation_type)
+
+
+def render_job(output_id, key, size):
+    """
+    Render one figure to the payload `render.plot` would send for it (runs in a pool worker).
+
+    Parameters:
+    - output_id (str): Output to render.
+    - key (tuple): Input values of the output (see `build_figure`).
+    - size (tuple): Client (width, height, pixelratio) of the output.
+
+    Returns:
+    - dict | None: The image payload, or None if the figure could not be rendered.
+    """
+    width, height, pixelratio = size
+    fig = build_figure(output_id, key, _worker["store"], _worker["geo_index"])
+    return figure_payload(fig, width, height, pixelratio)
+
+
+def figure_payload(fig, width, height, pixelratio=1):
+    """
+    Render a figure into the image payload of `render.plot` (public matplotlib API only).
+
+    Like `render.plot` for an output without a fixed size, the figure is
+    resized to the container (width x height CSS pixels at the figure's dpi
+    times the pixel ratio), laid out tight and sent with 100% width/height
+    attributes.
+
+    Parameters:
+    - fig (matplotlib.figure.Figure): Figure to render (closed afterwards).
+    - width (int): Container width in CSS pixels.
+    - height (int): Container height in CSS pixels.
+    - pixelratio (float): Device pixel ratio of the client.
+
+    Returns:
+    - dict | None: {"src", "width", "height"}, or None if rendering failed.
+    """
+    import matplotlib.pyplot as plt
+
+    try:
+        ppi = fig.get_dpi()
+        fig.set_size_inches(width / ppi, height / ppi)
+        fig.set_dpi(ppi * pixelratio)
+        if fig.get_layout_engine() is None:
+            fig.set_layout_engine("tight")
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=ppi * pixelratio)
+    except Exception:
+        return None
+    finally:
+        plt.close(fig)
+    data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {"src": f"data:image/png;base64,{data}", "width": "100%", "height": "100%"}
+
+
+def warmup_keys(years):
+    """
+    The input combinations worth pre-rendering for each output.
+
+    Every `geo_year` of the world map and every year x participation type for the
+    four industry plots; the Nation Level plot depends on four free country
+    picks and is left to the regular cache.
+    """
+    keys = {"geo_plot": [(year, "World") for year in years]}
+    for output_id in INDUSTRY_PLOTS:
+        keys[output_id] = [(year, ptype) for year in years for ptype in PARTICIPATION_TYPES]
+    return keys
+
+
+class Warmup:
+    """
+    Background pre-rendering of the slider states into a `FigureCache`.
+
+    Rendering runs in a spawned process pool, so app startup only pays for
+    creating the pool. Images depend on the client's plot size, so a batch is
+    scheduled for every (output, size) pair: sizes given at startup and every
+    new size reported by a session (through `cached_plot(on_miss=...)`).
+    Each pair is only scheduled once.
+
+    Parameters:
+    - cache (FigureCache): Cache receiving the rendered images.
+    - years (list): Years covered by the sliders.
+    - workers (int): Number of rendering processes.
+    - geo_tolerance (float): Geometry simplification tolerance (must match the app).
+    """
+
+    def __init__(self, cache, years, workers=2, geo_tolerance=0.05):
+        self.cache = cache
+        self.keys = warmup_keys(years)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(geo_tolerance,),
+        )
+        self._scheduled = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        atexit.register(self.shutdown)
+
+    def schedule(self, output_id, size):
+        """Queue every warm-up key of `output_id` at `size` that is not cached yet."""
+        if output_id not in self.keys:
+            return
+        with self._lock:
+            if (output_id, size) in self._scheduled:
+                return
+            self._scheduled.add((output_id, size))
+
+        for key in self.keys[output_id]:
+            cache_key = (output_id, key, size)
+            if cache_key in self.cache:
+                continue
+            future = self.executor.submit(render_job, output_id, key, size)
+            future.add_done_callback(partial(self._store, cache_key))
+            self.submitted += 1
+
+    def _store(self, cache_key, future):
+        if future.cancelled():
+            return
+        if future.exception() is not None or future.result() is None:
+            self.failed += 1
+            return
+        self.cache.put(cache_key, future.result())
+        self.completed += 1
+
+    def on_miss(self, output_id, size):
+        """Hook for `cached_plot`: warm the other slider states at a newly seen size."""
+        self.schedule(output_id, size)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_sizes(value):
+    """
+    Parse startup warm-up sizes such as "geo_plot=1200x400,industry=600x400@2".
+
+    `industry` applies to all four industry plots; the optional `@ratio` suffix
+    is the device pixel ratio (default 1).
+
+    Returns:
+    - list: (output_id, (width, height, pixelratio)) pairs.
+    """
+    sizes = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, spec = item.partition("=")
+        dims, _, ratio = spec.partition("@")
+        width, height = (int(v) for v in dims.lower().split("x"))
+        size = (width, height, float(ratio) if ratio else 1)
+        output_ids = list(INDUSTRY_PLOTS) if name == "industry" else [name]
+        sizes.extend((output_id, size) for output_id in output_ids)
+    return sizes
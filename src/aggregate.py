@@ -0,0 +1,182 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from classification import CATEGORIES, classify_industry
+from parallel import run_parallel, split_by
+
+# Numeric columns of the merged GVC + CE table
+NUMERIC_COLUMNS = ['CE', 'f', 'fs', 'fc', 'b', 'bs', 'bc', 'gvc', 'gvcc', 'gvcs']
+
+# Metrics needed by the Shiny datasets
+SUM_COLUMNS = ['CE']
+MEAN_COLUMNS = ['gvc', 'gvcs', 'gvcc', 'f', 'b']
+
+# Output layouts: processed_data.csv (country-year) and aggregated_data.csv
+# (country-classification-year)
+PROCESSED_COLUMNS = {
+    'CE': 'CE',
+    'gvc': 'average_gvc',
+    'gvcs': 'average_gvcs',
+    'gvcc': 'average_gvcc',
+    'f': 'average_f',
+    'b': 'average_b',
+}
+AGGREGATED_COLUMNS = ['CE', 'f', 'b', 'gvcs', 'gvcc']
+
+
+def prepare_initial(df):
+    """
+    Clean the merged GVC + CE table the way the Shiny datasets expect it.
+
+    Parameters:
+    - df (pd.DataFrame): The merged table (df_gvc / df_initial).
+
+    Returns:
+    - pd.DataFrame: A copy with numeric columns coerced and missing values set to 0.
+    """
+    df = df.copy()
+    # Tables read through `sinks.read_table` already carry numeric dtypes;
+    # only columns that arrived as text (e.g. from Excel) need coercing
+    for col in NUMERIC_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.fillna(0)
+
+
+def group_sums(df):
+    """
+    Accumulate counts and metric sums per country, classification and year in one pass.
+
+    Country, classification and year are integer-coded and combined into one
+    dense group id; every metric is then accumulated with one `np.bincount`
+    per column. Missing metric values count as 0, matching `prepare_initial`
+    followed by the Write-Up groupbys, so the merged table can be passed in
+    directly.
+
+    Sums of disjoint row sets can be added up, so a table processed in chunks
+    is aggregated by concatenating the per-chunk results (see
+    `combine_group_sums`).
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC + CE table (df_gvc), raw or prepared.
+
+    Returns:
+    - pd.DataFrame: One row per observed (country, classification, year) with
+      the row count `n` and the sum of every column in SUM_COLUMNS and
+      MEAN_COLUMNS, sorted by country, classification and year.
+    """
+    country_codes, countries = pd.factorize(df['country'], sort=True)
+    year_codes, years = pd.factorize(df['year'], sort=True)
+    class_codes = classify_industry(df['industry']).cat.codes.to_numpy()
+
+    shape = (len(countries), len(CATEGORIES), len(years))
+    group = np.ravel_multi_index((country_codes, class_codes, year_codes), shape)
+    size = int(np.prod(shape))
+
+    counts = np.bincount(group, minlength=size)
+    observed = counts > 0
+    c_idx, k_idx, y_idx = np.unravel_index(np.flatnonzero(observed), shape)
+    sums = pd.DataFrame({
+        'country': np.asarray(countries)[c_idx],
+        'classification': np.asarray(CATEGORIES)[k_idx],
+        'year': np.asarray(years)[y_idx],
+        'n': counts[observed],
+    })
+    for col in SUM_COLUMNS + MEAN_COLUMNS:
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors='coerce')
+        values = np.nan_to_num(values.to_numpy(dtype=float), nan=0.0)
+        sums[col] = np.bincount(group, weights=values, minlength=size)[observed]
+    return sums
+
+
+def combine_group_sums(partials):
+    """
+    Add up `group_sums` results computed on disjoint parts of the merged table.
+
+    Parameters:
+    - partials (list): DataFrames returned by `group_sums`.
+
+    Returns:
+    - pd.DataFrame: The `group_sums` result of the whole table.
+    """
+    partials = [p for p in partials if len(p)]
+    if len(partials) == 1:
+        return partials[0]
+    if not partials:
+        return pd.DataFrame(columns=['country', 'classification', 'year', 'n'] + SUM_COLUMNS + MEAN_COLUMNS)
+    return (pd.concat(partials, ignore_index=True)
+            .groupby(['country', 'classification', 'year'], sort=True)
+            .sum()
+            .reset_index())
+
+
+def datasets_from_sums(sums):
+    """
+    Turn `group_sums` output into processed_data and aggregated_data.
+
+    Parameters:
+    - sums (pd.DataFrame): Counts and sums per country, classification and year.
+
+    Returns:
+    - tuple: (processed_data, aggregated_data) DataFrames, sorted like the
+      corresponding groupby outputs.
+    """
+    # country x classification x year
+    aggregated_data = sums[['country', 'classification', 'year']].reset_index(drop=True)
+    for col in AGGREGATED_COLUMNS:
+        values = sums[col] if col in SUM_COLUMNS else sums[col] / sums['n']
+        aggregated_data[col] = values.to_numpy()
+
+    # country x year, folded over the classification axis
+    totals = sums.groupby(['country', 'year'], sort=True)[['n'] + list(PROCESSED_COLUMNS)].sum()
+    processed_data = totals.index.to_frame(index=False)
+    for col, name in PROCESSED_COLUMNS.items():
+        values = totals[col] if col in SUM_COLUMNS else totals[col] / totals['n']
+        processed_data[name] = values.to_numpy()
+
+    return processed_data, aggregated_data
+
+
+def aggregate_datasets(df, workers=1):
+    """
+    Compute processed_data and aggregated_data in a single pass over the merged table.
+
+    The large table is read once by `group_sums`; the country-year results are
+    folded from the country-classification-year sums and counts, so no
+    groupby merge is needed. With several workers every year is summed in its
+    own process and the sums are combined in year order.
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC + CE table (df_gvc), raw or prepared.
+    - workers (int): Number of processes; None uses one per CPU.
+
+    Returns:
+    - tuple: (processed_data, aggregated_data) DataFrames, sorted like the
+      corresponding groupby outputs.
+    """
+    if workers is not None and workers <= 1:
+        return datasets_from_sums(group_sums(df))
+    partials = run_parallel(group_sums, [part for _, part in split_by(df, 'year')], workers)
+    return datasets_from_sums(combine_group_sums(partials))
+
+
+def write_datasets(df, output_dir, workers=1):
+    """
+    Aggregate the merged table and write processed_data.csv and aggregated_data.csv together.
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC + CE table.
+    - output_dir (str): Destination folder.
+    - workers (int): Number of processes, see `aggregate_datasets`.
+
+    Returns:
+    - tuple: (processed_data, aggregated_data) as written.
+    """
+    processed_data, aggregated_data = aggregate_datasets(df, workers=workers)
+    processed_data.to_csv(os.path.join(output_dir, "processed_data.csv"), index=False)
+    aggregated_data.to_csv(os.path.join(output_dir, "aggregated_data.csv"), index=False)
+    return processed_data, aggregated_data
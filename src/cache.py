@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+
+import pyarrow.feather as feather
+
+# Bump when the layout of cached files changes so old entries are rebuilt
+CACHE_VERSION = 1
+
+
+def default_cache_dir(source_path):
+    """Cache files live in a hidden `.cache` folder next to the raw input."""
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), ".cache")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 content hash of a file, reading it in chunks.
+
+    Parameters:
+    - path (str): File to hash.
+    - chunk_size (int): Bytes read per chunk.
+
+    Returns:
+    - str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(source_path, params, cache_dir):
+    # Different reader parameters (columns, countries, years) get their own entry
+    key = json.dumps({"version": CACHE_VERSION, "params": params}, sort_keys=True, default=str)
+    key_hash = hashlib.sha256(key.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source_path))[0].replace(" ", "_")
+    base = os.path.join(cache_dir, f"{stem}-{key_hash}")
+    return f"{base}.feather", f"{base}.json"
+
+
+def _is_fresh(source_path, manifest_path):
+    """
+    Check whether a cache entry still matches its source file.
+
+    The size and mtime are compared first so an unchanged file is never
+    re-read. When they differ, the content hash decides: a touched but
+    identical file keeps its cache and only the manifest is refreshed.
+    """
+    if not os.path.exists(manifest_path):
+        return False, None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    stat = os.stat(source_path)
+    if manifest.get("size") == stat.st_size and manifest.get("mtime_ns") == stat.st_mtime_ns:
+        return True, manifest
+
+    digest = file_digest(source_path)
+    if manifest.get("sha256") != digest:
+        return False, None
+
+    manifest.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return True, manifest
+
+
+def cached_frame(source_path, build, params=None, cache_dir=None, refresh=False, return_path=False):
+    """
+    Return a DataFrame built from a raw input file, caching it as Feather.
+
+    On the first call `build()` parses the raw file and the result is written
+    as an uncompressed Feather (Arrow IPC) file, which later runs open through
+    a memory map. The entry is invalidated when the source file's mtime/size
+    change and its content hash no longer matches.
+
+    Parameters:
+    - source_path (str): Raw input file the frame is derived from.
+    - build (callable): Zero-argument function returning the parsed DataFrame.
+    - params (dict): Reader parameters that change the result (part of the cache key).
+    - cache_dir (str): Where cache files are stored; defaults to `<source dir>/.cache`.
+    - refresh (bool): Ignore any existing entry and rebuild it.
+    - return_path (bool): Also return the file the frame was read from.
+
+    Returns:
+    - pd.DataFrame: The cached or freshly built frame; with `return_path`, a
+      (frame, path) tuple where path is the Feather file on a cache hit and
+      `source_path` when the frame was rebuilt.
+    """
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    data_path, manifest_path = _cache_paths(source_path, params or {}, cache_dir)
+
+    if not refresh and os.path.exists(data_path):
+        fresh, _ = _is_fresh(source_path, manifest_path)
+        if fresh:
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+            return (df, data_path) if return_path else df
+
+    df = build()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(source_path)
+    manifest = {
+        "source": os.path.abspath(source_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_digest(source_path),
+        "params": params or {},
+        "rows": len(df),
+    }
+
+    # Write to temporary files first so an interrupted run never leaves a
+    # half-written entry behind
+    feather.write_feather(df.reset_index(drop=True), f"{data_path}.tmp", compression="uncompressed")
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(f"{data_path}.tmp", data_path)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    return (df, source_path) if return_path else df
+
+
+def clear_cache(cache_dir):
+    """Delete every cache entry in `cache_dir`."""
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith((".feather", ".json")):
+            os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# WIOD sector codes (C01 to C56)
+N_INDUSTRIES = 56
+INDUSTRY_CODES = [f"C{str(i+1).zfill(2)}" for i in range(N_INDUSTRIES)]
+
+# Aggregated sectors of the GVC data that keep their full name as industry
+AGGREGATE_SECTORS = ['Total', 'goods', 'manufacture', 'all service', 'services related to production']
+
+# Industry categories, in alphabetical order so grouped outputs keep the
+# row order of a plain string groupby
+CATEGORIES = ['Agriculture', 'Manufacturing', 'Mining', 'Other', 'Service']
+
+
+def _category_of(number):
+    if number <= 3:
+        return 'Agriculture'
+    if number == 4:
+        return 'Mining'
+    if number <= 23:
+        return 'Manufacturing'
+    return 'Service'
+
+
+# Sector -> category lookup table, the single source for every classification
+SECTOR_CLASSIFICATION = pd.DataFrame({
+    'industry': INDUSTRY_CODES,
+    'category': pd.Categorical([_category_of(i + 1) for i in range(N_INDUSTRIES)], categories=CATEGORIES),
+})
+
+# Dictionary form of the lookup table (e.g. for Series.map)
+industry_classification = dict(zip(SECTOR_CLASSIFICATION['industry'], SECTOR_CLASSIFICATION['category']))
+
+# Category code of every sector, followed by the code of 'Other' for unknown sectors
+_LOOKUP_CODES = np.append(SECTOR_CLASSIFICATION['category'].cat.codes.to_numpy(), CATEGORIES.index('Other'))
+
+
+def _industry_codes(sector):
+    return sector.where(sector.isin(AGGREGATE_SECTORS), sector.str[:3])
+
+
+def sector_to_industry(sector):
+    """
+    Derive the industry column from the GVC `sector` labels.
+
+    Sector labels start with their WIOD code ("C01 ...") and are cut to it;
+    the aggregated sectors in `AGGREGATE_SECTORS` keep their name. For a
+    categorical input the work is done once per category, not per row.
+
+    Parameters:
+    - sector (pd.Series): The `sector` column (object or categorical).
+
+    Returns:
+    - pd.Series: Industry codes, categorical when the input is categorical.
+    """
+    if isinstance(sector.dtype, pd.CategoricalDtype):
+        categories = sector.cat.categories.to_series()
+        mapping = dict(zip(categories, _industry_codes(categories)))
+        return sector.map(mapping).astype('category')
+    return _industry_codes(sector)
+
+
+def classify_industry(industry):
+    """
+    Map sector codes to their industry category in one vectorized lookup.
+
+    Parameters:
+    - industry (pd.Series): Sector codes, in any case ("C01" or "c01").
+      Aggregated sectors and unknown codes are classified as 'Other'.
+
+    Returns:
+    - pd.Series: Categorical categories ('Agriculture', 'Manufacturing',
+      'Mining', 'Other', 'Service') with the index of `industry`.
+    """
+    if isinstance(industry.dtype, pd.CategoricalDtype):
+        # Classify the categories once and expand through the category codes
+        # (missing values have code -1 and end up as 'Other')
+        per_category = _category_codes(industry.cat.categories.to_series())
+        codes = np.append(per_category, CATEGORIES.index('Other'))[industry.cat.codes.to_numpy()]
+    else:
+        codes = _category_codes(industry)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=CATEGORIES), index=industry.index)
+
+
+def _category_codes(industry):
+    positions = pd.Categorical(industry.str.upper(), categories=INDUSTRY_CODES).codes
+    # Position -1 (unknown sector) selects the trailing 'Other' code
+    return _LOOKUP_CODES[positions]
@@ -0,0 +1,56 @@
+from classification import sector_to_industry
+from merge import MERGE_KEYS
+
+# Regions left out of the merged table: no CO2 sheet for 'NLD', and 'ROW'
+# (Rest of the world) is not a country
+EXCLUDED_REGIONS = ('NLD', 'ROW')
+
+# Short names of the GVC participation columns
+GVC_COLUMNS = {
+    'GVCpt_f': 'f',
+    'GVCpt_f_s': 'fs',
+    'GVCpt_f_c': 'fc',
+    'GVCpt_b': 'b',
+    'GVCpt_b_s': 'bs',
+    'GVCpt_b_c': 'bc',
+}
+
+
+def clean_gvc(df_gvc_original, exclude=EXCLUDED_REGIONS):
+    """
+    Turn the raw GVC table into df_gvc (before the CO2 merge).
+
+    Derives the country and industry columns, drops the excluded regions,
+    sorts by year, country and industry, shortens the GVCpt_* names and adds
+    the total (gvc), complex (gvcc) and simple (gvcs) participation columns.
+    The input frame is not modified.
+
+    Parameters:
+    - df_gvc_original (pd.DataFrame): Table from `read_gvc_csv`.
+    - exclude (tuple): Regions to drop.
+
+    Returns:
+    - pd.DataFrame: year, country, industry, the six participation columns,
+      gvc, gvcc and gvcs.
+    """
+    # Revise country and industry columns
+    country = df_gvc_original['region'].str[:3]
+    keep = ~country.isin(exclude)
+    df_gvc = df_gvc_original[keep].drop(columns=['region', 'sector'])
+    df_gvc['country'] = country[keep]
+
+    # Keep the sorted industry (sector code, or the aggregated sector name)
+    df_gvc['industry'] = sector_to_industry(df_gvc_original['sector'][keep])
+
+    # Sort by year, country and industry (key columns first)
+    df_gvc = df_gvc.sort_values(MERGE_KEYS, ignore_index=True)
+    df_gvc = df_gvc[MERGE_KEYS + [col for col in df_gvc.columns if col not in MERGE_KEYS]]
+
+    # Rename the columns
+    df_gvc = df_gvc.rename(columns=GVC_COLUMNS)
+
+    # Create new columns
+    df_gvc['gvc'] = df_gvc['f'] + df_gvc['b']
+    df_gvc['gvcc'] = df_gvc['fc'] + df_gvc['bc']
+    df_gvc['gvcs'] = df_gvc['fs'] + df_gvc['bs']
+    return df_gvc
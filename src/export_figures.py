@@ -0,0 +1,276 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from cache import file_digest
+from figures import (generate_industry_plots_with_means_and_diag, gvc_map_frame, plot_gvc_map,
+                     plot_gvc_participation_colored, plot_participation_trends)
+from parallel import run_parallel
+from regions import RegionIndex
+from schema import apply_schema
+from sinks import read_table
+
+# Batch export of the figures of processing.py, e.g. (from src/):
+#     python export_figures.py --formats png svg --workers 4
+#     python export_figures.py figure3 figure5 --force
+# Figures are built from the merged table written by processing.py
+# (data/df.parquet) and rendered in worker processes. A figure is skipped when
+# the fingerprint of its input rows and options matches the one recorded in
+# the output folder's manifest and its files still exist.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INPUT = os.path.join(REPO_DIR, "data", "df.parquet")
+DEFAULT_SHAPEFILE = os.path.join(REPO_DIR, "data", "world-administrative-boundaries",
+                                 "world-administrative-boundaries.shp")
+DEFAULT_OUTPUT_DIR = os.path.join(REPO_DIR, "writeup", "pictures")
+
+MANIFEST_NAME = "figures.json"
+
+# Bump when the figure builders change so every figure is re-rendered
+FIGURES_VERSION = 1
+
+FIGURE_YEAR = 2014
+
+# Countries and year range of the participation trends (Figure 1)
+TREND_COUNTRIES = ['USA', 'CHN', 'JPN', 'RUS']
+TREND_YEARS = (2000, 2014)
+
+# Panels of the country-sector figures: (sector(s), countries to label)
+FORWARD_BACKWARD_PANELS = {
+    'manufacture': ('manufacture', ['IND', 'DEU', 'JPN']),
+    'agriculture': (['C01', 'C02', 'C03'], []),
+    'all_service': ('all service', []),
+    'mining': ('C04', ['JPN', 'RUS'])
+}
+
+SIMPLE_COMPLEX_PANELS = {
+    'manufacture': ('manufacture', ['CNH', 'USA', 'RUS', 'BEL']),
+    'agriculture': (['C01', 'C02', 'C03'], ['IND', 'CAN']),
+    'all_service': ('all service', []),
+    'mining': ('C04', ['USA'])
+}
+
+EUROPE_BOUNDS = (-10, 42, 15, 60)  # (min_lon, min_lat, max_lon, max_lat)
+
+
+def _year(df, columns, year=FIGURE_YEAR):
+    return df.loc[df['year'] == year, ['year', *columns]].reset_index(drop=True)
+
+
+def _figure1_data(df):
+    rows = df['country'].isin(TREND_COUNTRIES) & df['year'].between(*TREND_YEARS)
+    return df.loc[rows, ['country', 'year', 'f', 'b']].reset_index(drop=True)
+
+
+def _figure1(data, regions):
+    return plot_participation_trends(data, TREND_COUNTRIES, years=TREND_YEARS)
+
+
+def _figure2(data, regions):
+    return plot_gvc_participation_colored(data, FIGURE_YEAR)
+
+
+def _figure3(data, regions):
+    return generate_industry_plots_with_means_and_diag(data, FORWARD_BACKWARD_PANELS, FIGURE_YEAR)
+
+
+def _figure4(data, regions):
+    return generate_industry_plots_with_means_and_diag(
+        data, SIMPLE_COMPLEX_PANELS, FIGURE_YEAR, axes='simple_complex', label_color='grey'
+    )
+
+
+def _figure5(data, regions):
+    return plot_gvc_map(gvc_map_frame(data, regions, FIGURE_YEAR), f"GVC Participation by Country, {FIGURE_YEAR}")
+
+
+def _figure6(data, regions):
+    return plot_gvc_map(gvc_map_frame(data, regions, FIGURE_YEAR, region=EUROPE_BOUNDS),
+                        f"GVC Participation by Country (Europe), {FIGURE_YEAR}")
+
+
+# Figure registry: name -> input selection (the rows and columns the figure
+# reads, which are also fingerprinted), builder, and whether it needs the
+# world shapefile (passed as a RegionIndex). Builders return an Altair chart
+# or a matplotlib figure.
+FIGURES = {
+    'figure1': {'data': _figure1_data, 'build': _figure1, 'shapefile': False},
+    'figure2': {'data': lambda df: _year(df, ['industry', 'f', 'b']), 'build': _figure2, 'shapefile': False},
+    'figure3': {'data': lambda df: _year(df, ['country', 'industry', 'f', 'b']), 'build': _figure3,
+                'shapefile': False},
+    'figure4': {'data': lambda df: _year(df, ['country', 'industry', 'gvcc', 'gvcs']), 'build': _figure4,
+                'shapefile': False},
+    'figure5': {'data': lambda df: _year(df, ['country', 'gvc']), 'build': _figure5, 'shapefile': True},
+    'figure6': {'data': lambda df: _year(df, ['country', 'gvc']), 'build': _figure6, 'shapefile': True},
+}
+
+
+@functools.cache
+def _regions(shapefile):
+    # Read and indexed once per worker process, shared by the map figures it renders
+    import geopandas as gpd
+    return RegionIndex(gpd.read_file(shapefile))
+
+
+def figure_fingerprint(name, data, options):
+    """
+    Hash of a figure's input rows and the options that change its files.
+
+    Parameters:
+    - name (str): Figure name.
+    - data (pd.DataFrame): The figure's input selection.
+    - options (dict): Formats, scale, shapefile digest, ...
+
+    Returns:
+    - str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": FIGURES_VERSION, "name": name, "options": options},
+                             sort_keys=True, default=str).encode())
+    digest.update(json.dumps([str(c) for c in data.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_figure(name, data, output_dir, formats, shapefile=None, scale=2):
+    """
+    Build one registered figure and save it in every format.
+
+    Runs in a worker process, so it only receives picklable arguments and
+    loads the shapefile itself.
+
+    Parameters:
+    - name (str): Key of `FIGURES`.
+    - data (pd.DataFrame): The figure's input selection.
+    - output_dir (str): Destination folder.
+    - formats (list): File extensions ('png', 'svg').
+    - shapefile (str): World boundaries, for the map figures.
+    - scale (float): Pixel scale of Altair PNGs (matplotlib figures use 100 * scale dpi).
+
+    Returns:
+    - tuple: (name, written paths, build seconds, save seconds).
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    entry = FIGURES[name]
+    start = time.perf_counter()
+    regions = _regions(shapefile) if entry['shapefile'] else None
+    figure = entry['build'](data, regions)
+    built = time.perf_counter()
+
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        tmp = f"{path}.{os.getpid()}.tmp.{fmt}"
+        if isinstance(figure, plt.Figure):
+            figure.savefig(tmp, format=fmt, dpi=100 * scale, bbox_inches="tight")
+        else:
+            figure.save(tmp, format=fmt, scale_factor=scale)
+        os.replace(tmp, path)
+        paths.append(path)
+    if isinstance(figure, plt.Figure):
+        plt.close(figure)
+
+    return name, paths, built - start, time.perf_counter() - built
+
+
+def export_figures(input_path=DEFAULT_INPUT, output_dir=DEFAULT_OUTPUT_DIR, names=None, formats=("png",),
+                   shapefile=DEFAULT_SHAPEFILE, scale=2, workers=None, force=False, verbose=True):
+    """
+    Render the registered figures whose inputs changed since the last export.
+
+    Parameters:
+    - input_path (str): Merged table written by processing.py.
+    - output_dir (str): Destination folder (also holds the manifest).
+    - names (list): Figures to consider; None renders every registered figure.
+    - formats (tuple): File extensions ('png', 'svg').
+    - shapefile (str): World boundaries for the map figures.
+    - scale (float): Output scale (see `render_figure`).
+    - workers (int): Worker processes; None uses one per CPU.
+    - force (bool): Render even when the fingerprint is unchanged.
+    - verbose (bool): Print the per-figure timings.
+
+    Returns:
+    - dict: Per figure, `status` ('rendered' or 'skipped'), `files` and the
+      `build`/`save` seconds of rendered figures.
+    """
+    names = list(FIGURES) if names is None else list(names)
+    unknown = [name for name in names if name not in FIGURES]
+    if unknown:
+        raise ValueError(f"Unknown figures: {unknown} (registered: {list(FIGURES)})")
+
+    df = apply_schema(read_table(input_path))
+    shapefile_digest = file_digest(shapefile) if any(FIGURES[n]['shapefile'] for n in names) else None
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    results, tasks, fingerprints = {}, [], {}
+    for name in names:
+        data = FIGURES[name]['data'](df)
+        options = {"formats": list(formats), "scale": scale,
+                   "shapefile": shapefile_digest if FIGURES[name]['shapefile'] else None}
+        fingerprint = figure_fingerprint(name, data, options)
+        previous = manifest.get(name, {})
+        if (not force and previous.get("fingerprint") == fingerprint
+                and all(os.path.exists(os.path.join(output_dir, f)) for f in previous.get("files", []))):
+            results[name] = {"status": "skipped", "files": [os.path.join(output_dir, f) for f in previous["files"]]}
+            continue
+        fingerprints[name] = fingerprint
+        tasks.append((name, data, output_dir, list(formats), shapefile, scale))
+
+    start = time.perf_counter()
+    for name, paths, build_seconds, save_seconds in run_parallel(render_figure, tasks, workers=workers):
+        results[name] = {"status": "rendered", "files": paths, "build": build_seconds, "save": save_seconds}
+        # File names only, so the manifest stays valid when the folder moves
+        manifest[name] = {"fingerprint": fingerprints[name], "files": [os.path.basename(p) for p in paths],
+                          "seconds": round(build_seconds + save_seconds, 3)}
+    elapsed = time.perf_counter() - start
+
+    tmp = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+
+    if verbose:
+        for name in names:
+            result = results[name]
+            if result["status"] == "skipped":
+                print(f"{name:<10} skipped (unchanged)")
+            else:
+                print(f"{name:<10} build {result['build']:6.2f}s  save {result['save']:6.2f}s  "
+                      f"-> {', '.join(os.path.basename(p) for p in result['files'])}")
+        print(f"Rendered {len(tasks)} of {len(names)} figures in {elapsed:.2f}s")
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the figures of processing.py to image files.")
+    parser.add_argument("names", nargs="*", help=f"figures to render (default: all of {', '.join(FIGURES)})")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="merged table (default: data/df.parquet)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="destination (default: writeup/pictures)")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=["png", "svg"])
+    parser.add_argument("--shapefile", default=DEFAULT_SHAPEFILE, help="world boundaries for Figures 5 and 6")
+    parser.add_argument("--scale", type=float, default=2)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="render unchanged figures too")
+    args = parser.parse_args(argv)
+
+    export_figures(args.input, args.output_dir, names=args.names or None, formats=tuple(args.formats),
+                   shapefile=args.shapefile, scale=args.scale, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
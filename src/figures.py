@@ -0,0 +1,279 @@
+import altair as alt
+import pandas as pd
+
+from classification import AGGREGATE_SECTORS, classify_industry
+
+
+class FigureData:
+    """
+    Named datasets shared by the layers and panels of one figure.
+
+    Every table is stored once in the top-level `datasets` of the spec and
+    the layers reference it by name (filtering it with a transform where a
+    panel only needs part of it), instead of embedding a copy of the data in
+    every layer and panel.
+    """
+
+    def __init__(self):
+        self.datasets = {}
+
+    def add(self, name, df):
+        """
+        Register a table under `name`.
+
+        Parameters:
+        - name (str): Dataset name used in the spec.
+        - df (pd.DataFrame): Table to embed once.
+
+        Returns:
+        - alt.NamedData: Reference to pass to `alt.Chart`.
+        """
+        self.datasets[name] = alt.to_values(df)['values']
+        return alt.NamedData(name=name)
+
+    def diagonal(self, x, y):
+        """Register the (0, 0) - (1, 1) reference line in the fields of a scatter plot."""
+        name = f"diagonal-{x}-{y}"
+        if name not in self.datasets:
+            self.add(name, pd.DataFrame({x: [0, 1], y: [0, 1]}))
+        return alt.NamedData(name=name)
+
+    def attach(self, chart):
+        """Add the registered datasets to the top level of the finished chart."""
+        return chart.properties(datasets=self.datasets)
+
+
+def plot_participation_trends(df, countries, years=(2000, 2014)):
+    """
+    Generate line plots of the average forward and backward participation indexes over time.
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC dataset.
+    - countries (list): Countries to draw.
+    - years (tuple): Inclusive (first, last) year range.
+
+    Returns:
+    - alt.HConcatChart: The forward (f) and backward (b) plots side by side.
+    """
+    # Calculate the average f and b by country and year, grouped by industry
+    averaged_df = df[
+        df['country'].isin(countries) &
+        df['year'].between(*years)
+    ].groupby(['country', 'year'], observed=True)[['f', 'b']].mean().reset_index()
+
+    data = FigureData()
+    trends = data.add('participation-trends', averaged_df)
+
+    # Define a common y-axis scale
+    y_axis_scale = alt.Scale(domain=[0, 0.35])
+
+    plots = []
+    for column, name in [('f', 'Forward'), ('b', 'Backward')]:
+        # Line plot with scatter points, both layers reading the same named dataset
+        base = alt.Chart(trends).encode(
+            x=alt.X('year:O', title='Year', axis=alt.Axis(labelAngle=45)),
+            y=alt.Y(f'{column}:Q', title=f'{name} Participation Index (%)',
+                    scale=y_axis_scale, axis=alt.Axis(format='%')),
+            color='country:N',  # Different color for each country
+            tooltip=['year:O', 'country:N', f'{column}:Q']
+        )
+        plots.append((base.mark_line() + base.mark_point()).properties(
+            title=f'{name} Participation Index Over Time',
+            width=600,
+            height=300
+        ))
+
+    return data.attach(alt.hconcat(*plots))
+
+
+def plot_gvc_participation_colored(df, year):
+    """
+    Generate a scatter plot of GVC Participation Indexes with industries grouped into 4 categories,
+    differentiated by color.
+
+    Parameters:
+    - df (pd.DataFrame): The dataset containing GVC data.
+    - year (int): The year to filter the dataset on.
+
+    Returns:
+    - alt.LayerChart: A scatter plot chart showing sectoral GVC participation indexes with categories.
+    """
+    # Filter the data for the specified year and only keep types
+    df = df[~df['industry'].isin(AGGREGATE_SECTORS)]
+    df_filtered = df[df['year'] == year]
+
+    # Compute sectoral averages across all countries
+    df_mean = df_filtered.groupby('industry', as_index=False, observed=True).agg({
+        'f': 'mean',  # Mean forward-linkage
+        'b': 'mean'   # Mean backward-linkage
+    })
+
+    # Add classification based on industry
+    df_mean['category'] = classify_industry(df_mean['industry'])
+
+    # Trim the data to ensure points are within the [0, 1] range for both axes
+    df_mean_trimmed = df_mean[(df_mean['f'] <= 1) & (df_mean['f'] >= 0) &
+                              (df_mean['b'] <= 1) & (df_mean['b'] >= 0)]
+
+    data = FigureData()
+
+    # Scatter plot
+    scatter_plot = alt.Chart(data.add('sector-means', df_mean_trimmed)).mark_point(filled=True, size=80).encode(
+        x=alt.X('b:Q', title='Average Backward-Linkage', scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y('f:Q', title='Average Forward-Linkage', scale=alt.Scale(domain=[0, 1])),
+        color=alt.Color('category:N', title='Industry Category', legend=alt.Legend(orient='right')),
+        tooltip=['industry:N', 'category:N', 'f:Q', 'b:Q']
+    )
+
+    # Add diagonal reference line (b=f)
+    diagonal_line = alt.Chart(data.diagonal('b', 'f')).mark_line(color='gray', strokeDash=[5, 5]).encode(
+        x='b:Q',
+        y='f:Q'
+    )
+
+    # Combine scatter plot with diagonal line
+    final_plot = (scatter_plot + diagonal_line).properties(
+        title=f"GVC Participation Indexes, Sectoral Level, {year}",
+        width=400,
+        height=400
+    )
+
+    return data.attach(final_plot).configure_title(fontSize=16)
+
+
+# Measures of the country-sector scatter plots: (column, axis title)
+LINKAGE_AXES = {
+    'forward_backward': (('b', 'Backward-Linkage'), ('f', 'Forward-Linkage')),
+    'simple_complex': (('gvcc', 'Complicated-Linkage'), ('gvcs', 'Simple-Linkage')),
+}
+
+
+def generate_industry_plots_with_means_and_diag(df, industries, year, axes='forward_backward', label_color='green',
+                                                columns=1):
+    """
+    Generate scatter plots for specified industries, with country labels and a diagonal line.
+
+    Every panel's country means are registered once as a named dataset that
+    the scatter and label layers share; the labels select their countries
+    with a filter instead of a second copy of the rows, and all panels share
+    one diagonal dataset.
+
+    Parameters:
+    - df (pd.DataFrame): The dataset containing the industry data.
+    - industries (dict): A dictionary where keys are industry names and values are tuples:
+        (sector(s), list of countries to label).
+    - year (int): The year to filter the dataset on.
+    - axes (str): Measures to plot, a key of `LINKAGE_AXES`: 'forward_backward'
+      (b against f) or 'simple_complex' (gvcc against gvcs).
+    - label_color (str): Color of the country labels.
+    - columns (int): Plots per row; 1 stacks them vertically.
+
+    Returns:
+    - alt.VConcatChart: A vertically concatenated (or grid) Altair chart containing all industry plots.
+    """
+    (x, x_title), (y, y_title) = LINKAGE_AXES[axes]
+
+    # Filter the data for the specified year
+    df_filtered_year = df[df['year'] == year]
+
+    data = FigureData()
+    diagonal = data.diagonal(x, y)
+
+    plots = []
+    for industry, (sector, countries_to_label) in industries.items():
+        # Filter by sector(s)
+        sectors = sector if isinstance(sector, list) else [sector]
+        df_filtered = df_filtered_year[df_filtered_year['industry'].isin(sectors)]
+
+        # Compute mean values for each country within the filtered data
+        df_mean = df_filtered.groupby('country', as_index=False, observed=True).agg({x: 'mean', y: 'mean'})
+        panel = alt.Chart(data.add(f'{industry}-{x}-{y}', df_mean))
+
+        # Scatter plot with black points
+        scatter_plot = panel.mark_point(color='black', clip=True).encode(
+            x=alt.X(f'{x}:Q', title=x_title, scale=alt.Scale(domain=[0, 1])),
+            y=alt.Y(f'{y}:Q', title=y_title, scale=alt.Scale(domain=[0, 1])),
+            tooltip=['country:N', f'{y}:Q', f'{x}:Q']  # Show country name on hover
+        )
+
+        # Adding country labels for specified countries
+        country_labels = panel.transform_filter(
+            alt.FieldOneOfPredicate(field='country', oneOf=list(countries_to_label))
+        ).mark_text(align='left', fontSize=12, dx=5, dy=-5, color=label_color).encode(
+            x=f'{x}:Q',
+            y=f'{y}:Q',
+            text='country:N'
+        )
+
+        # Adding the diagonal line
+        diagonal_line = alt.Chart(diagonal).mark_line(color='orange', strokeDash=[4, 4]).encode(
+            x=f'{x}:Q',
+            y=f'{y}:Q'
+        )
+
+        # Combine scatter plot, country labels, and diagonal line
+        plots.append((scatter_plot + country_labels + diagonal_line).properties(
+            title=f"{industry.capitalize()}, {year}"
+        ))
+
+    if columns > 1:
+        # Arrange plots in a grid of `columns` plots per row
+        plots = [alt.hconcat(*plots[i:i + columns]) for i in range(0, len(plots), columns)]
+
+    # Combine all plots (or rows) vertically
+    return data.attach(alt.vconcat(*plots))
+
+
+def gvc_map_frame(df, regions, year, region='World', clip=False):
+    """
+    Join the country means of one year onto the member-state boundaries of a region.
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC dataset.
+    - regions (RegionIndex): Member-state geometries with their spatial index.
+    - year (int): The year to filter the dataset on.
+    - region (str | tuple): Region name or (min_lon, min_lat, max_lon, max_lat) bounds.
+    - clip (bool): Cut the geometries to the region's extent.
+
+    Returns:
+    - gpd.GeoDataFrame: Member states of the region with the mean of every
+      numeric column (missing for countries without GVC data).
+    """
+    # Filter for the year, group by country, and calculate the mean for all numeric columns
+    df_geo = (
+        df[df['year'] == year].groupby('country', as_index=False, observed=True)
+        .mean(numeric_only=True)
+    )
+    df_geo['country'] = df_geo['country'].astype(str)
+
+    # Rename the 'country' column to 'iso3' for consistent merging
+    df_geo = df_geo.rename(columns={'country': 'iso3'})
+
+    # Merge the cached regional subset with the GVC data based on the 'iso3' column
+    return regions.subset(region, clip=clip).merge(df_geo, on="iso3", how="left")
+
+
+def plot_gvc_map(world, title, column='gvc'):
+    """
+    Plot a choropleth map of GVC participation.
+
+    Parameters:
+    - world (gpd.GeoDataFrame): Output of `gvc_map_frame`.
+    - title (str): Plot title.
+    - column (str): Column mapped to the color scale.
+
+    Returns:
+    - matplotlib.figure.Figure: The map.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(1, 1, figsize=(15, 10))
+    world.boundary.plot(ax=ax, linewidth=1, color="grey")  # Draw country boundaries in grey
+    world.plot(column=column, ax=ax, legend=True,          # Visualize GVC participation using a color scale
+               cmap="Blues", edgecolor="black",            # Use blue shades for the color map
+               missing_kwds={"color": "lightgrey"})        # Use light grey for missing data
+
+    # Add a title and hide axes
+    ax.set_title(title, fontsize=16)
+    ax.axis("off")
+    return fig
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from aggregate import aggregate_datasets
+from parallel import run_parallel
+
+MANIFEST_NAME = "manifest.json"
+
+
+def partition_fingerprint(part):
+    """
+    Hash the content of one partition of the merged table.
+
+    Parameters:
+    - part (pd.DataFrame): Rows of a single partition.
+
+    Returns:
+    - str: SHA-256 hex digest over the column names and row hashes.
+    """
+    part = part.sort_values(['year', 'country', 'industry']).reset_index(drop=True)
+    digest = hashlib.sha256(",".join(part.columns).encode())
+    digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _partition_name(partition_by, key):
+    key = key if isinstance(key, tuple) else (key,)
+    return "/".join(f"{col}={value}" for col, value in zip(partition_by, key))
+
+
+def _load_manifest(partition_dir, partition_by):
+    path = os.path.join(partition_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        manifest = json.load(f)
+    # A different partitioning scheme invalidates every stored partition
+    if manifest.get("partition_by") != list(partition_by):
+        return {}
+    return manifest.get("partitions", {})
+
+
+def incremental_build(df_gvc, output_dir, partition_by=('year',), force=False, verbose=True, workers=1):
+    """
+    Rebuild processed_data.csv and aggregated_data.csv, recomputing only changed partitions.
+
+    The merged GVC + CE table is split by `partition_by` (year, and optionally
+    country) and every partition is fingerprinted. Partitions whose fingerprint
+    matches the manifest from the previous build keep their stored results;
+    only new or changed partitions are aggregated again. Because the partition
+    columns are a subset of the group keys (country, year), each group lives in
+    exactly one partition, so the final files are a concatenation of the stored
+    partition results and unchanged data is never rescanned.
+
+    Parameters:
+    - df_gvc (pd.DataFrame): The merged GVC + CE table.
+    - output_dir (str): Data folder receiving the CSV files and the `partitions` store.
+    - partition_by (tuple): Partition columns, ('year',) or ('year', 'country').
+    - force (bool): Recompute every partition.
+    - verbose (bool): Print which partitions were rebuilt.
+    - workers (int): Processes aggregating the changed partitions; None uses one per CPU.
+
+    Returns:
+    - dict: Lists of `rebuilt`, `reused` and `removed` partition names.
+    """
+    partition_by = list(partition_by)
+    if not set(partition_by) <= {'year', 'country'}:
+        raise ValueError("partition_by must only contain 'year' and/or 'country'")
+
+    partition_dir = os.path.join(output_dir, "partitions")
+    previous = {} if force else _load_manifest(partition_dir, partition_by)
+    # Without a usable manifest (forced, first build or a changed partition_by)
+    # nothing stored can be reused, so old partition directories are dropped
+    if not previous and os.path.isdir(partition_dir):
+        shutil.rmtree(partition_dir)
+
+    current = {}
+    summary = {"rebuilt": [], "reused": [], "removed": []}
+    changed = []
+
+    for key, part in df_gvc.groupby(partition_by, sort=True, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        name = _partition_name(partition_by, key)
+        fingerprint = partition_fingerprint(part)
+        current[name] = fingerprint
+
+        target = os.path.join(partition_dir, name)
+        if previous.get(name) == fingerprint and os.path.isdir(target):
+            summary["reused"].append(name)
+            continue
+
+        changed.append((name, part.reset_index(drop=True)))
+
+    # Recompute the changed partitions (in parallel when workers > 1); only
+    # their results are stored, the merged rows live in df.parquet
+    results = run_parallel(aggregate_datasets, [part for _, part in changed], workers)
+    for (name, _), (processed_data, aggregated_data) in zip(changed, results):
+        target = os.path.join(partition_dir, name)
+        os.makedirs(target, exist_ok=True)
+        processed_data.to_feather(os.path.join(target, "processed.feather"))
+        aggregated_data.to_feather(os.path.join(target, "aggregated.feather"))
+        summary["rebuilt"].append(name)
+
+    # Drop partitions that no longer exist in the input (e.g. a removed year)
+    for name in set(previous) - set(current):
+        shutil.rmtree(os.path.join(partition_dir, name), ignore_errors=True)
+        summary["removed"].append(name)
+
+    if summary["rebuilt"] or summary["removed"] or not _outputs_exist(output_dir):
+        processed_data = _collect(partition_dir, current, "processed.feather", ['country', 'year'])
+        aggregated_data = _collect(partition_dir, current, "aggregated.feather",
+                                   ['country', 'classification', 'year'])
+        processed_data.to_csv(os.path.join(output_dir, "processed_data.csv"), index=False)
+        aggregated_data.to_csv(os.path.join(output_dir, "aggregated_data.csv"), index=False)
+
+    os.makedirs(partition_dir, exist_ok=True)
+    with open(os.path.join(partition_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"partition_by": partition_by, "partitions": current}, f, indent=2)
+
+    if verbose:
+        print(f"Incremental build: {len(summary['rebuilt'])} rebuilt, "
+              f"{len(summary['reused'])} reused, {len(summary['removed'])} removed partitions")
+
+    return summary
+
+
+def _outputs_exist(output_dir):
+    return all(os.path.exists(os.path.join(output_dir, name))
+               for name in ("processed_data.csv", "aggregated_data.csv"))
+
+
+def _collect(partition_dir, partitions, filename, sort_by):
+    # Partition results are disjoint, so the full table is their concatenation
+    frames = [pd.read_feather(os.path.join(partition_dir, name, filename)) for name in partitions]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values(sort_by).reset_index(drop=True)
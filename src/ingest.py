@@ -0,0 +1,154 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import cached_frame
+from classification import INDUSTRY_CODES, N_INDUSTRIES
+from parallel import default_workers, run_parallel
+
+# Columns of the WIOD GVC participation CSV that the pipeline uses
+# (the exported row index "Unnamed: 0" is pruned on read)
+GVC_DTYPES = {
+    "region": "category",
+    "sector": "category",
+    "year": "int64",
+    "GVCpt_f": "float64",
+    "GVCpt_f_s": "float64",
+    "GVCpt_f_c": "float64",
+    "GVCpt_b": "float64",
+    "GVCpt_b_s": "float64",
+    "GVCpt_b_c": "float64",
+}
+
+
+def read_gvc_csv(path, cache=True, cache_dir=None, return_path=False):
+    """
+    Read the WIOD GVC participation CSV with pruned columns and explicit dtypes.
+
+    Parameters:
+    - path (str): Path to the "GVCpt_WIOD2016.All...csv" file.
+    - cache (bool): Reuse the columnar cache of a previous read when the file is unchanged.
+    - cache_dir (str): Cache location; defaults to `<data dir>/.cache`.
+    - return_path (bool): Also return the file actually read (the cache file on a hit).
+
+    Returns:
+    - pd.DataFrame: The GVC table with region, sector, year and GVCpt_* columns
+      (a (frame, path) tuple with `return_path`).
+    """
+    def build():
+        return pd.read_csv(path, usecols=list(GVC_DTYPES), dtype=GVC_DTYPES)
+
+    if not cache:
+        return (build(), path) if return_path else build()
+    return cached_frame(path, build, params={"columns": GVC_DTYPES}, cache_dir=cache_dir, return_path=return_path)
+
+
+def _parse_co2_sheets(source, sheets, year_labels):
+    # Parse a group of country sheets into (industry, year) arrays
+    excel_data = source if isinstance(source, pd.ExcelFile) else pd.ExcelFile(source)
+    frames = excel_data.parse(sheet_name=sheets) if sheets else {}
+    return [
+        frames[country].iloc[:N_INDUSTRIES].reindex(columns=year_labels).to_numpy(dtype=float)
+        for country in sheets
+    ]
+
+
+def _sheet_groups(sheets, workers):
+    # Contiguous, nearly equal groups of sheets: one workbook load per worker
+    n_groups = max(1, min(workers or default_workers(), len(sheets)))
+    bounds = np.linspace(0, len(sheets), n_groups + 1).round().astype(int)
+    return [sheets[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def read_co2_workbook(source, countries, years=(2000, 2014), verbose=True, workers=1):
+    """
+    Read the CO2 emissions workbook in a single pass and return it in long format.
+
+    All country sheets are parsed with one `parse` call, stacked into a
+    (country, industry, year) array and flattened once, so the cost grows
+    linearly with the number of sheets instead of re-concatenating per sheet.
+
+    Parameters:
+    - source (str | pd.ExcelFile): Path to "CO2 emissions.xlsx" or an opened ExcelFile.
+    - countries (list): Country sheet names to read; missing sheets are skipped.
+    - years (tuple): Inclusive (first, last) year range to keep.
+    - verbose (bool): Print the ingest throughput in rows per second.
+    - workers (int): Parse the sheets in this many processes (each one reading
+      a contiguous group of sheets; None uses one per CPU). Needs a path as
+      `source`; the result does not depend on it.
+
+    Returns:
+    - pd.DataFrame: Columns country, year, industry, co2_emissions, sorted by
+      year, country and industry, with categorical country/industry columns.
+    """
+    start = time.perf_counter()
+
+    excel_data = source if isinstance(source, pd.ExcelFile) else pd.ExcelFile(source)
+    sheets = sorted(c for c in set(countries) if c in excel_data.sheet_names)
+
+    # Every sheet starts with the 56 WIOD sectors; year columns are stored
+    # as strings ("2000", "2001", ...)
+    year_labels = [str(y) for y in range(years[0], years[1] + 1)]
+    groups = _sheet_groups(sheets, workers)
+    if len(groups) <= 1 or isinstance(source, pd.ExcelFile):
+        blocks = _parse_co2_sheets(excel_data, sheets, year_labels)
+    else:
+        # Worker processes open the workbook themselves; groups stay in sheet
+        # order so the stacked blocks are identical to a serial read
+        tasks = [(source, group, year_labels) for group in groups]
+        blocks = [block for group_blocks in run_parallel(_parse_co2_sheets, tasks, workers) for block in group_blocks]
+
+    # (country, industry, year) -> (year, country, industry) so the flattened
+    # order already matches the sort by year, country, industry
+    if blocks:
+        values = np.stack(blocks).transpose(2, 0, 1).ravel()
+    else:
+        values = np.empty(0, dtype=float)
+
+    n_countries, n_years = len(sheets), len(year_labels)
+    CO2 = pd.DataFrame({
+        "country": pd.Categorical.from_codes(
+            np.tile(np.repeat(np.arange(n_countries), N_INDUSTRIES), n_years), categories=sheets
+        ),
+        "year": np.repeat(np.arange(years[0], years[1] + 1), n_countries * N_INDUSTRIES),
+        "industry": pd.Categorical.from_codes(
+            np.tile(np.arange(N_INDUSTRIES), n_countries * n_years), categories=INDUSTRY_CODES
+        ),
+        "co2_emissions": values,
+    })
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        rate = len(CO2) / elapsed if elapsed > 0 else float("inf")
+        print(f"CO2 ingest: {len(CO2):,} rows from {n_countries} sheets "
+              f"in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+    return CO2
+
+
+def load_co2(path, countries, years=(2000, 2014), cache=True, cache_dir=None, verbose=True, workers=1,
+             return_path=False):
+    """
+    Load the long-format CO2 table, reusing the columnar cache when possible.
+
+    Parameters:
+    - path (str): Path to "CO2 emissions.xlsx".
+    - countries (list): Country sheet names to read.
+    - years (tuple): Inclusive (first, last) year range to keep.
+    - cache (bool): Reuse the cache of a previous read when the workbook is unchanged.
+    - cache_dir (str): Cache location; defaults to `<data dir>/.cache`.
+    - verbose (bool): Print the ingest throughput when the workbook is parsed.
+    - workers (int): Processes parsing the sheets on a cache miss.
+    - return_path (bool): Also return the file actually read (the cache file on a hit).
+
+    Returns:
+    - pd.DataFrame: See `read_co2_workbook` (a (frame, path) tuple with `return_path`).
+    """
+    def build():
+        return read_co2_workbook(path, countries, years=years, verbose=verbose, workers=workers)
+
+    if not cache:
+        return (build(), path) if return_path else build()
+    params = {"countries": sorted(set(countries)), "years": list(years)}
+    return cached_frame(path, build, params=params, cache_dir=cache_dir, return_path=return_path)
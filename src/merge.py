@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Join keys between the GVC table and the long-format CO2 table
+MERGE_KEYS = ['year', 'country', 'industry']
+
+# Largest packed key space looked up through a dense position table; larger
+# spaces fall back to a binary search over the sorted keys
+DENSE_LIMIT = 1 << 24
+
+
+class KeyIndex:
+    """
+    Packed integer index over composite join keys.
+
+    Every key column is turned into small integer codes (integer columns as
+    offsets from their minimum, label columns as positions in a sorted
+    vocabulary) and the codes are packed into one int64 per row. A lookup
+    then packs the probe rows the same way and finds them with one `take`
+    from a dense position table (or `searchsorted` for large key spaces),
+    instead of hashing every key column of every row as `pd.merge` does.
+    Categorical probe columns are recoded once per category.
+
+    Parameters:
+    - table (pd.DataFrame): Indexed table; the keys must be unique.
+    - keys (list): Key columns, e.g. `MERGE_KEYS`.
+    """
+
+    def __init__(self, table, keys=MERGE_KEYS):
+        self.keys = list(keys)
+        self.columns = []  # per key: ('int', minimum, size) or ('label', vocabulary, size)
+        codes = []
+        for key in self.keys:
+            values = table[key]
+            if pd.api.types.is_integer_dtype(values.dtype):
+                array = values.to_numpy(dtype=np.int64)
+                low = int(array.min()) if len(array) else 0
+                size = int(array.max()) - low + 1 if len(array) else 1
+                self.columns.append(('int', low, size))
+                codes.append(array - low)
+            else:
+                vocabulary = pd.Index(pd.unique(values.astype(str))).sort_values()
+                self.columns.append(('label', vocabulary, len(vocabulary)))
+                codes.append(vocabulary.get_indexer(values.astype(str)))
+        self.size = int(np.prod([size for _, _, size in self.columns], dtype=np.int64))
+
+        packed = self._pack(codes)
+        order = np.argsort(packed, kind='stable')
+        self.sorted_keys = packed[order]
+        self.rows = order
+        if len(packed) > 1 and (np.diff(self.sorted_keys) == 0).any():
+            raise ValueError(f"Indexed table has duplicate {tuple(self.keys)} keys")
+
+        self.dense = None
+        if self.size <= DENSE_LIMIT:
+            self.dense = np.full(self.size, -1, dtype=np.int64)
+            self.dense[self.sorted_keys] = self.rows
+
+    def _pack(self, codes):
+        packed = np.zeros(len(codes[0]) if codes else 0, dtype=np.int64)
+        for (_, _, size), code in zip(self.columns, codes):
+            packed = packed * size + code
+        return packed
+
+    def _probe_codes(self, df):
+        # Codes of the probe rows per key column, -1 where a value is not indexed
+        codes = []
+        for key, (kind, base, size) in zip(self.keys, self.columns):
+            values = df[key]
+            if kind == 'int':
+                code = values.to_numpy(dtype=np.int64) - base
+                code[(code < 0) | (code >= size)] = -1
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                per_category = base.get_indexer(values.cat.categories.astype(str))
+                code = np.append(per_category, -1)[values.cat.codes.to_numpy()]
+            else:
+                code = base.get_indexer(values.astype(str))
+            codes.append(code)
+        return codes
+
+    def lookup(self, df):
+        """
+        Find the indexed row of every row of `df`.
+
+        Parameters:
+        - df (pd.DataFrame): Probe rows with the key columns.
+
+        Returns:
+        - np.ndarray: Row positions in the indexed table, -1 for unmatched keys.
+        """
+        codes = self._probe_codes(df)
+        known = np.logical_and.reduce([code >= 0 for code in codes])
+        packed = self._pack([np.where(known, code, 0) for code in codes])
+
+        positions = np.full(len(df), -1, dtype=np.int64)
+        if self.dense is not None:
+            positions[known] = self.dense[packed[known]]
+        elif len(self.sorted_keys):
+            slots = np.searchsorted(self.sorted_keys, packed[known])
+            slots = np.minimum(slots, len(self.sorted_keys) - 1)
+            found = self.sorted_keys[slots] == packed[known]
+            positions[np.flatnonzero(known)[found]] = self.rows[slots[found]]
+        return positions
+
+    def take(self, df, values):
+        """
+        Left-join one column of the indexed table onto `df`.
+
+        Parameters:
+        - df (pd.DataFrame): Probe rows with the key columns.
+        - values (array-like): Column of the indexed table, in its row order.
+
+        Returns:
+        - tuple: (float array aligned with `df`, NaN for unmatched keys;
+          boolean mask of the unmatched rows).
+        """
+        positions = self.lookup(df)
+        unmatched = positions < 0
+        values = np.asarray(values, dtype=float)
+        taken = values.take(np.where(unmatched, 0, positions)) if len(values) else np.zeros(len(df))
+        taken[unmatched] = np.nan
+        return taken, unmatched
+
+
+def unmatched_keys(df, unmatched, keys=MERGE_KEYS):
+    """Distinct key combinations of the rows flagged by `KeyIndex.take`."""
+    return df.loc[unmatched, keys].drop_duplicates().reset_index(drop=True)
+
+
+def merge_co2(df_gvc, CO2, index=None, verbose=True):
+    """
+    Left-join the CO2 emissions onto the cleaned GVC table as column `CE`.
+
+    The CO2 values are looked up through a `KeyIndex` over (year, country,
+    industry) in one vectorized pass; rows without a CO2 value get a
+    missing CE, as with a left merge, and are reported from the same pass.
+
+    Parameters:
+    - df_gvc (pd.DataFrame): Cleaned GVC table.
+    - CO2 (pd.DataFrame): Long-format CO2 table from `load_co2`.
+    - index (KeyIndex): Prebuilt index over `CO2` (built when None).
+    - verbose (bool): Print the number of rows and keys without CO2.
+
+    Returns:
+    - pd.DataFrame: df_gvc (same row order) with the additional `CE` column.
+    """
+    if index is None:
+        index = KeyIndex(CO2, MERGE_KEYS)
+    values, unmatched = index.take(df_gvc, CO2['co2_emissions'].to_numpy())
+
+    # Shallow copy: the new column does not touch df_gvc and no data is copied
+    df = df_gvc.copy(deep=False)
+    df['CE'] = values
+    if verbose and unmatched.any():
+        missing = unmatched_keys(df_gvc, unmatched)
+        print(f"CO2 merge: {int(unmatched.sum()):,} rows without CO2 "
+              f"({len(missing):,} keys, e.g. {tuple(missing.iloc[0])})")
+    return df
@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    """Number of worker processes used when `workers` is None (one per CPU)."""
+    return os.cpu_count() or 1
+
+
+def workers_rerun_main():
+    """
+    Whether worker processes re-run the `__main__` script when they start.
+
+    With the "spawn" and "forkserver" start methods ("spawn" is the default
+    on macOS and Windows) every worker imports the script the program was
+    started from as `__mp_main__`, so top-level code outside an
+    `if __name__ == "__main__":` block runs again in each worker. Forked
+    workers and interactive sessions (a Jupyter kernel has no main file) are
+    not affected.
+
+    Returns:
+    - bool: True when the main module would be re-imported by the workers.
+    """
+    if multiprocessing.get_start_method() == "fork":
+        return False
+    main = sys.modules["__main__"]
+    return getattr(main.__spec__, "name", None) is not None or getattr(main, "__file__", None) is not None
+
+
+def run_parallel(func, tasks, workers=1):
+    """
+    Run `func(*args)` for every argument tuple in `tasks`, in worker processes.
+
+    Results come back in the order of `tasks` regardless of which worker
+    finishes first, so combining them gives the same output for any worker
+    count. With `workers` <= 1 (or a single task) everything runs in the
+    current process without pickling.
+
+    Parameters:
+    - func (callable): Module-level function (it must be picklable).
+    - tasks (list): Argument tuples, one per call.
+    - workers (int): Number of processes; None uses one per CPU.
+
+    Returns:
+    - list: `func` results in task order.
+    """
+    tasks = [args if isinstance(args, tuple) else (args,) for args in tasks]
+    workers = default_workers() if workers is None else workers
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        return [func(*args) for args in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+
+def split_by(df, column):
+    """
+    Split a table into one part per value of `column`, in sorted value order.
+
+    Parameters:
+    - df (pd.DataFrame): Table to split.
+    - column (str): Split column (e.g. 'year').
+
+    Returns:
+    - list: (value, part) tuples.
+    """
+    return [(value, part) for value, part in df.groupby(column, sort=True, observed=True)]
@@ -0,0 +1,101 @@
+import numpy as np
+
+# Named map extents: (min_lon, min_lat, max_lon, max_lat) in degrees
+# (the world shapefile is EPSG:4326); None is the whole map. Shared with the
+# Shiny Geo tab (shiny/basic-navigation/geometry.py), which lists the regions
+# at startup, so geopandas and shapely are only imported on first use
+REGION_EXTENTS = {
+    'World': None,
+    'Europe': (-25, 34, 45, 72),
+    'Asia': (25, -12, 150, 56),
+    'Americas': (-170, -56, -30, 84),
+    'Africa': (-26, -36, 60, 38),
+    'Oceania': (110, -50, 180, 0),
+}
+
+
+def region_bounds(region):
+    """
+    Extent of a region.
+
+    Parameters:
+    - region (str | tuple): Name in `REGION_EXTENTS` or (min_lon, min_lat, max_lon, max_lat).
+
+    Returns:
+    - tuple | None: The bounds, or None for the whole map.
+    """
+    if isinstance(region, str):
+        if region not in REGION_EXTENTS:
+            raise ValueError(f"Unknown region {region!r} (known: {list(REGION_EXTENTS)})")
+        return REGION_EXTENTS[region]
+    return tuple(region)
+
+
+def select_region(frame, tree, region, clip=False):
+    """
+    Rows of a GeoDataFrame intersecting a region, found with one STRtree query.
+
+    Parameters:
+    - frame (gpd.GeoDataFrame): Geometries the tree was built over.
+    - tree (shapely.STRtree): Spatial index of `frame.geometry`.
+    - region (str | tuple): Name in `REGION_EXTENTS` or a bounds tuple.
+    - clip (bool): Cut the geometries to the extent (e.g. drop the
+      overseas parts of a country from a Europe map).
+
+    Returns:
+    - gpd.GeoDataFrame: The intersecting rows in their original order (`frame` itself for the whole map).
+    """
+    import shapely
+
+    bounds = region_bounds(region)
+    if bounds is None:
+        return frame
+
+    rows = np.sort(tree.query(shapely.box(*bounds), predicate="intersects"))
+    subset = frame.iloc[rows].reset_index(drop=True)
+    if clip:
+        subset = subset.set_geometry(shapely.clip_by_rect(subset.geometry.values, *bounds))
+    return subset
+
+
+class RegionIndex:
+    """
+    Member-state geometries with a spatial index for regional map subsets.
+
+    The shapefile is filtered to member states (and optionally simplified)
+    once, and an STRtree is built over the geometries. A region (a name of
+    `REGION_EXTENTS` or a bounds tuple) is selected with one tree query
+    instead of a bounding-box scan over the whole GeoDataFrame; the subset
+    is kept, so every later map of the same region is a dictionary lookup.
+
+    Parameters:
+    - world (gpd.GeoDataFrame): The world administrative boundaries.
+    - tolerance (float): Simplification tolerance in degrees (0 keeps full resolution).
+    - status (str): Value of the `status` column to keep.
+    """
+
+    def __init__(self, world, tolerance=0, status="Member State"):
+        import shapely
+
+        members = world[world["status"] == status].reset_index(drop=True)
+        if tolerance:
+            members = members.set_geometry(members.geometry.simplify(tolerance, preserve_topology=True))
+        self.members = members
+        self.tree = shapely.STRtree(members.geometry.values)
+        self._subsets = {}
+
+    def subset(self, region='World', clip=False):
+        """
+        Member states intersecting a region.
+
+        Parameters:
+        - region (str | tuple): Name in `REGION_EXTENTS` or (min_lon, min_lat, max_lon, max_lat).
+        - clip (bool): Cut the geometries to the extent.
+
+        Returns:
+        - gpd.GeoDataFrame: The cached subset (do not modify it in place).
+        """
+        key = (region if isinstance(region, str) else tuple(region), clip)
+        if key not in self._subsets:
+            self._subsets[key] = select_region(self.members, self.tree, key[0], clip=clip)
+        return self._subsets[key]
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# Key columns of the merged GVC + CE table
+KEY_COLUMNS = ['year', 'country', 'industry']
+
+# Participation indexes and CO2 emissions of the merged table
+METRIC_COLUMNS = ['f', 'fs', 'fc', 'b', 'bs', 'bc', 'gvc', 'gvcc', 'gvcs', 'CE']
+
+# Column types of the merged table, in column order: categorical labels, a
+# 2-byte year and float64 metrics (float32 with `merged_dtypes(float32=True)`)
+MERGED_DTYPES = {
+    'year': 'int16',
+    'country': 'category',
+    'industry': 'category',
+    **{col: 'float64' for col in METRIC_COLUMNS},
+}
+
+
+def merged_dtypes(float32=False):
+    """
+    Column types of the merged table.
+
+    Parameters:
+    - float32 (bool): Store the metric columns as float32 (half the memory,
+      about 7 significant digits).
+
+    Returns:
+    - dict: Column name -> dtype, in column order.
+    """
+    if not float32:
+        return dict(MERGED_DTYPES)
+    return {col: 'float32' if col in METRIC_COLUMNS else dtype for col, dtype in MERGED_DTYPES.items()}
+
+
+def validate_schema(df, dtypes=None):
+    """
+    Check a table against the merged table schema.
+
+    Parameters:
+    - df (pd.DataFrame): Table to check.
+    - dtypes (dict): Expected column types; defaults to `MERGED_DTYPES`.
+
+    Returns:
+    - list: Problems found (missing or unexpected columns, wrong types,
+      duplicate keys); empty when the table matches.
+    """
+    dtypes = MERGED_DTYPES if dtypes is None else dtypes
+    problems = []
+
+    missing = [col for col in dtypes if col not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {missing}")
+    extra = [col for col in df.columns if col not in dtypes]
+    if extra:
+        problems.append(f"unexpected columns: {extra}")
+
+    for col, dtype in dtypes.items():
+        if col in df.columns and not _has_dtype(df[col], dtype):
+            problems.append(f"column '{col}' is {df[col].dtype}, expected {dtype}")
+
+    keys = [col for col in KEY_COLUMNS if col in df.columns]
+    if keys == KEY_COLUMNS and df.duplicated(keys).any():
+        problems.append(f"duplicate {'/'.join(KEY_COLUMNS)} keys: {int(df.duplicated(keys).sum())} rows")
+
+    return problems
+
+
+def apply_schema(df, float32=False, validate=True):
+    """
+    Convert the merged table to the compact schema at load time.
+
+    Values are checked before narrowing: years must fit in int16 and finite
+    metrics in float32, so the conversion never silently changes a value
+    beyond float32 rounding.
+
+    Parameters:
+    - df (pd.DataFrame): The merged GVC + CE table (df_gvc).
+    - float32 (bool): Store the metric columns as float32.
+    - validate (bool): Raise when the converted table does not match the schema.
+
+    Returns:
+    - pd.DataFrame: The table with the columns and types of `merged_dtypes(float32)`.
+
+    Raises:
+    - ValueError: If a value does not fit its new type, or (with `validate`)
+      the table does not match the schema.
+    """
+    dtypes = merged_dtypes(float32)
+    _check_range(df, dtypes)
+
+    # Schema columns first, in schema order; anything else is left for validation to report
+    df = df[[col for col in dtypes if col in df.columns] + [col for col in df.columns if col not in dtypes]]
+    df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+    if validate:
+        problems = validate_schema(df, dtypes)
+        if problems:
+            raise ValueError("Merged table does not match the schema: " + "; ".join(problems))
+    return df
+
+
+def _has_dtype(series, dtype):
+    if dtype == 'category':
+        return isinstance(series.dtype, pd.CategoricalDtype)
+    return series.dtype == np.dtype(dtype)
+
+
+def _check_range(df, dtypes):
+    for col, dtype in dtypes.items():
+        if col not in df.columns or dtype == 'category':
+            continue
+        values = df[col].to_numpy()
+        if np.dtype(dtype).kind == 'i':
+            info = np.iinfo(dtype)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                raise ValueError(f"column '{col}' has values outside the {dtype} range")
+        elif np.dtype(dtype) == np.float32:
+            finite = values[np.isfinite(values)]
+            if len(finite) and np.abs(finite).max() > np.finfo(np.float32).max:
+                raise ValueError(f"column '{col}' has values outside the float32 range")
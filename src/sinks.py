@@ -0,0 +1,127 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from schema import MERGED_DTYPES  # column types restored when reading CSV/Excel
+
+# Registered output sinks: name -> (file extension, writer)
+SINKS = {}
+
+
+def register_sink(name, extension):
+    """
+    Register a writer function as an output sink.
+
+    Parameters:
+    - name (str): Name used in `formats` (e.g. "parquet").
+    - extension (str): File extension appended to the table name (e.g. ".parquet").
+
+    Returns:
+    - callable: Decorator storing `writer(df, path)` in `SINKS`.
+    """
+    def decorator(writer):
+        SINKS[name] = (extension, writer)
+        return writer
+    return decorator
+
+
+@register_sink("parquet", ".parquet")
+def write_parquet(df, path):
+    """
+    Write one Parquet row group per year, sorted by year and country.
+
+    Every row group then carries min/max statistics on `year` and `country`,
+    so readers filtering on them (`filters=[('year', '==', 2014)]`) skip the
+    other row groups entirely.
+    """
+    df = df.sort_values(['year', 'country']).reset_index(drop=True)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression="snappy", write_statistics=True) as writer:
+        for _, year_df in df.groupby('year', sort=True):
+            writer.write_table(pa.Table.from_pandas(year_df, schema=schema, preserve_index=False))
+
+
+@register_sink("feather", ".feather")
+def write_feather(df, path):
+    """Write an Arrow IPC (Feather) file with zstd compression."""
+    df.reset_index(drop=True).to_feather(path, compression="zstd")
+
+
+@register_sink("csv", ".csv.gz")
+def write_csv(df, path):
+    """Write a gzip-compressed CSV file."""
+    df.to_csv(path, index=False, compression="gzip")
+
+
+@register_sink("excel", ".xlsx")
+def write_excel(df, path):
+    """Write an Excel workbook (slow, optional export for manual inspection)."""
+    df.to_excel(path, index=False)
+
+
+def sink_paths(output_dir, name, formats=("parquet",)):
+    """
+    Paths `write_table` writes for the requested sinks.
+
+    Parameters:
+    - output_dir (str): Destination folder.
+    - name (str): File name without extension (e.g. "df").
+    - formats (list): Sink names from `SINKS`.
+
+    Returns:
+    - list: One path per format, in the order of `formats`.
+    """
+    paths = []
+    for fmt in formats:
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown output format '{fmt}', choose from {sorted(SINKS)}")
+        paths.append(os.path.join(output_dir, f"{name}{SINKS[fmt][0]}"))
+    return paths
+
+
+def write_table(df, output_dir, name, formats=("parquet",)):
+    """
+    Write a table to every requested output sink.
+
+    Parameters:
+    - df (pd.DataFrame): Table to write (e.g. the merged df_gvc).
+    - output_dir (str): Destination folder.
+    - name (str): File name without extension (e.g. "df").
+    - formats (list): Sink names from `SINKS` ("parquet", "feather", "csv", "excel").
+
+    Returns:
+    - list: Paths of the written files.
+    """
+    paths = sink_paths(output_dir, name, formats)
+    for fmt, path in zip(formats, paths):
+        SINKS[fmt][1](df, path)
+    return paths
+
+
+def read_table(path, columns=None, filters=None):
+    """
+    Read a table written by `write_table`, keeping its column types.
+
+    Parameters:
+    - path (str): File written by one of the sinks.
+    - columns (list): Optional subset of columns to read.
+    - filters (list): Optional Parquet row-group filters, e.g. [('year', '==', 2014)].
+
+    Returns:
+    - pd.DataFrame: The table with its original dtypes.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    if path.endswith(".feather"):
+        return pd.read_feather(path, columns=columns)
+    if path.endswith((".csv", ".csv.gz")):
+        df = pd.read_csv(path, usecols=columns)
+        dtypes = {col: dtype for col, dtype in MERGED_DTYPES.items() if col in df.columns}
+        return df.astype(dtypes)
+    if path.endswith(".xlsx"):
+        df = pd.read_excel(path, usecols=columns)
+        dtypes = {col: dtype for col, dtype in MERGED_DTYPES.items() if col in df.columns}
+        return df.astype(dtypes)
+    raise ValueError(f"Unsupported table format: {path}")
@@ -0,0 +1,245 @@
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+
+# Instrumentation of the named stages of processing.py (co2_ingest,
+# gvc_ingest, gvc_clean, merge, export, figures.*). Every stage appends one
+# JSON line to the stage log with its wall/CPU time, peak and current RSS,
+# input/output row counts and the bytes read and written, e.g.
+#     pipeline = PipelineLog("../../data/logs/pipeline.jsonl", profile={"merge": "cprofile"})
+#     with pipeline.stage("merge", rows_in=len(df_gvc)) as stage:
+#         df_gvc = merge_co2(df_gvc, CO2)
+#         stage.rows_out = len(df_gvc)
+# Peak RSS covers this process only (not the worker processes of WORKERS > 1).
+
+# Profilers selectable per stage
+PROFILERS = ("cprofile", "tracemalloc")
+
+# Functions listed in the text report of a cProfile or tracemalloc capture
+PROFILE_TOP = 30
+
+
+def _rss_mb():
+    # Current resident set size (Linux /proc; None elsewhere)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _reset_peak_rss():
+    # Reset the kernel's RSS high-water mark so it covers a single stage
+    # (Linux >= 4.0); returns False where the peak can only be process-wide
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(stage_scope):
+    if stage_scope:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 2**10
+        except (OSError, ValueError):
+            pass
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def file_bytes(paths, since=None):
+    """
+    Total size of the existing files in `paths`.
+
+    Parameters:
+    - paths (list): File paths (missing files count as 0).
+    - since (float): Only count files modified at or after this `time.time()`.
+
+    Returns:
+    - int: Number of bytes.
+    """
+    total = 0
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        if since is None or info.st_mtime >= since:
+            total += info.st_size
+    return total
+
+
+class Stage:
+    """
+    Measurements of one running stage, filled in by the stage body.
+
+    Set `rows_in` / `rows_out` directly and report files with `read` and
+    `wrote`; `wrote` only counts files the stage actually (re)wrote, so
+    outputs skipped by an incremental build add no bytes.
+    """
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.started = time.time()
+        self.extra = {}
+
+    def read(self, *paths):
+        self.bytes_read += file_bytes(paths)
+
+    def wrote(self, *paths):
+        self.bytes_written += file_bytes(paths, since=self.started - 1)
+
+
+class PipelineLog:
+    """
+    Structured log of the pipeline stages of one run.
+
+    Parameters:
+    - path (str): JSON-lines file the stage records are appended to (None
+      keeps them in memory only, see `records`).
+    - profile (str or dict): Profiler for every stage ("cprofile" or
+      "tracemalloc"), or a {stage name: profiler} mapping; None profiles nothing.
+    - profile_dir (str): Folder of the capture files (default: next to `path`).
+    - verbose (bool): Print one line per finished stage.
+    """
+
+    def __init__(self, path=None, profile=None, profile_dir=None, verbose=True):
+        self.path = path
+        self.profile = profile or {}
+        self.profile_dir = profile_dir or os.path.join(os.path.dirname(path) if path else ".", "profiles")
+        self.verbose = verbose
+        self.run = datetime.datetime.now().isoformat(timespec="seconds")
+        self.records = []
+
+        for name, profiler in self._profilers():
+            if profiler not in PROFILERS:
+                raise ValueError(f"Unknown profiler '{profiler}' for stage '{name}', choose from {PROFILERS}")
+
+    def _profilers(self):
+        if isinstance(self.profile, str):
+            return [("*", self.profile)]
+        return list(self.profile.items())
+
+    def _profiler(self, name):
+        if isinstance(self.profile, str):
+            return self.profile
+        return self.profile.get(name)
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time the body of a `with` block as the stage `name`.
+
+        Parameters:
+        - name (str): Stage name, e.g. "merge" or "figures.figure1".
+        - rows_in (int): Input rows, if known before the stage runs.
+
+        Returns:
+        - Stage: Measurements the body fills in (rows_out, files read/written).
+        """
+        stage = Stage(name, rows_in=rows_in)
+        profiler = self._profiler(name)
+        stage_scope = _reset_peak_rss()
+
+        capture = None
+        if profiler == "cprofile":
+            capture = cProfile.Profile()
+            capture.enable()
+        elif profiler == "tracemalloc":
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            if profiler == "cprofile":
+                capture.disable()
+                stage.extra["profile"] = self._dump_cprofile(name, capture)
+            elif profiler == "tracemalloc":
+                stage.extra["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+                stage.extra["profile"] = self._dump_tracemalloc(name, tracemalloc.take_snapshot())
+                if started_tracing:
+                    tracemalloc.stop()
+            self._finish(stage, wall, cpu, stage_scope)
+
+    def _finish(self, stage, wall, cpu, stage_scope):
+        rss = _rss_mb()
+        record = {
+            "run": self.run,
+            "stage": stage.name,
+            "seconds": round(wall, 6),
+            "cpu_seconds": round(cpu, 6),
+            "peak_rss_mb": round(_peak_rss_mb(stage_scope), 1),
+            "peak_rss_scope": "stage" if stage_scope else "process",
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "rows_in": stage.rows_in,
+            "rows_out": stage.rows_out,
+            "bytes_read": stage.bytes_read,
+            "bytes_written": stage.bytes_written,
+        }
+        record.update(stage.extra)
+        self.records.append(record)
+
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        if self.verbose:
+            rows = f", {stage.rows_out:,} rows" if stage.rows_out is not None else ""
+            print(f"[{stage.name}] {wall:.2f}s, peak RSS {record['peak_rss_mb']:,.0f} MB{rows}")
+
+    def _capture_path(self, name, extension):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        run = self.run.replace(":", "")
+        return os.path.join(self.profile_dir, f"{name}-{run}{extension}")
+
+    def _dump_cprofile(self, name, capture):
+        # Binary stats for snakeviz/pstats plus a text report by cumulative time
+        path = self._capture_path(name, ".prof")
+        capture.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(capture, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        with open(path[:-len(".prof")] + ".txt", "w") as f:
+            f.write(report.getvalue())
+        return path
+
+    def _dump_tracemalloc(self, name, snapshot):
+        # Largest live allocations by source line at the end of the stage
+        path = self._capture_path(name, ".tracemalloc.txt")
+        with open(path, "w") as f:
+            for statistic in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                f.write(f"{statistic}\n")
+        return path
+
+    def report(self):
+        """Print a table of the stages logged so far in this run."""
+        print(f"{'stage':<20} {'seconds':>9} {'peak MB':>9} {'rows in':>12} {'rows out':>12} "
+              f"{'MB read':>9} {'MB written':>10}")
+        for record in self.records:
+            rows_in = f"{record['rows_in']:,}" if record["rows_in"] is not None else ""
+            rows_out = f"{record['rows_out']:,}" if record["rows_out"] is not None else ""
+            print(f"{record['stage']:<20} {record['seconds']:>9.2f} {record['peak_rss_mb']:>9,.0f} "
+                  f"{rows_in:>12} {rows_out:>12} {record['bytes_read'] / 2**20:>9.1f} "
+                  f"{record['bytes_written'] / 2**20:>10.1f}")
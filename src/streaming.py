@@ -0,0 +1,164 @@
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregate import combine_group_sums, datasets_from_sums, group_sums
+from classification import sector_to_industry
+from clean import EXCLUDED_REGIONS, GVC_COLUMNS
+from ingest import GVC_DTYPES
+from merge import MERGE_KEYS, KeyIndex
+from schema import MERGED_DTYPES
+
+# Dtypes used while reading chunks: categorical labels and a small year type
+STREAM_DTYPES = {**GVC_DTYPES, "year": "int16"}
+
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def _arrow_type(dtype):
+    if dtype == 'category':
+        # A fixed dictionary index width keeps the schema identical across chunks
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+# Schema of the streamed Parquet output, in the column order of the in-memory df_gvc
+MERGED_SCHEMA = pa.schema([(col, _arrow_type(dtype)) for col, dtype in MERGED_DTYPES.items()])
+
+
+def transform_chunk(chunk, co2_index, co2_values, exclude=EXCLUDED_REGIONS):
+    """
+    Apply the df_gvc transformations of `processing.py` to one chunk of the GVC CSV.
+
+    Parameters:
+    - chunk (pd.DataFrame): Rows read with `STREAM_DTYPES`.
+    - co2_index (KeyIndex): Index over the CO2 table's (year, country, industry) keys.
+    - co2_values (np.ndarray): `co2_emissions` in the CO2 table's row order.
+    - exclude (tuple): Regions to drop.
+
+    Returns:
+    - pd.DataFrame: The merged rows (columns of `MERGED_DTYPES`), sorted by
+      year, country and industry.
+    """
+    country = chunk['region'].str[:3]
+    keep = ~country.isin(exclude).to_numpy()
+
+    df = pd.DataFrame({
+        'year': chunk['year'].to_numpy()[keep],
+        'country': country.to_numpy()[keep],
+        'industry': sector_to_industry(chunk['sector']).to_numpy()[keep],
+    })
+    for source, name in GVC_COLUMNS.items():
+        df[name] = chunk[source].to_numpy()[keep]
+    df['gvc'] = df['f'] + df['b']
+    df['gvcc'] = df['fc'] + df['bc']
+    df['gvcs'] = df['fs'] + df['bs']
+
+    # Left join through the prebuilt packed key index (unmatched keys get a missing CE)
+    df['CE'], _ = co2_index.take(df, co2_values)
+
+    return df.sort_values(['year', 'country', 'industry']).reset_index(drop=True)
+
+
+def stream_gvc(path, CO2, output_dir, name="df", chunksize=DEFAULT_CHUNKSIZE,
+               exclude=EXCLUDED_REGIONS, verbose=True):
+    """
+    Build the merged GVC + CE table chunk by chunk with bounded memory.
+
+    The GVC CSV is read `chunksize` rows at a time with pruned columns and
+    compact dtypes. Every chunk is transformed and joined to CO2 through a
+    prebuilt packed key index, split by year into per-year spill files and
+    folded into the running aggregation sums, so neither the full GVC table
+    nor the merged table is ever held in memory. Peak memory is set by
+    `chunksize`, not by the size of the input.
+
+    The spill files are then copied row group by row group into
+    `<name>.parquet`, so its row groups are ordered by year and a read with
+    a year filter only touches that year's row groups. Within a year the rows
+    are sorted by country and industry per chunk only (not across chunks).
+
+    Parameters:
+    - path (str): Path to the GVC participation CSV.
+    - CO2 (pd.DataFrame): Long-format CO2 table from `load_co2`.
+    - output_dir (str): Folder receiving `<name>.parquet`, processed_data.csv
+      and aggregated_data.csv.
+    - name (str): File name of the merged table, without extension.
+    - chunksize (int): Number of CSV rows per chunk.
+    - exclude (tuple): Regions to drop.
+    - verbose (bool): Print row counts and throughput.
+
+    Returns:
+    - dict: `rows_read`, `rows_written`, `chunks`, `unmatched` (rows without a
+      CO2 value) and the path of the merged table.
+    """
+    start = time.perf_counter()
+    co2_index = KeyIndex(CO2, MERGE_KEYS)
+    co2_values = CO2['co2_emissions'].to_numpy(dtype=float)
+
+    output_path = os.path.join(output_dir, f"{name}.parquet")
+    partial = output_path + ".partial"
+    spill_dir = output_path + ".years"
+    shutil.rmtree(spill_dir, ignore_errors=True)
+    os.makedirs(spill_dir)
+    summary = {"rows_read": 0, "rows_written": 0, "chunks": 0, "unmatched": 0, "path": output_path}
+    partials = []
+
+    reader = pd.read_csv(path, usecols=list(STREAM_DTYPES), dtype=STREAM_DTYPES, chunksize=chunksize)
+    spills = {}  # year -> ParquetWriter of that year's rows
+    try:
+        for chunk in reader:
+            df = transform_chunk(chunk, co2_index, co2_values, exclude=exclude)
+            summary["rows_read"] += len(chunk)
+            summary["chunks"] += 1
+            if df.empty:
+                # Only excluded regions (NLD and ROW close the export): nothing to spill or sum
+                continue
+
+            # The chunk is sorted by year, so every year is one contiguous slice
+            years = df['year'].to_numpy()
+            bounds = np.flatnonzero(np.diff(years)) + 1
+            for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(df)]):
+                year = int(years[lo])
+                if year not in spills:
+                    spills[year] = pq.ParquetWriter(os.path.join(spill_dir, f"{year}.parquet"), MERGED_SCHEMA,
+                                                    compression="snappy")
+                part = df.iloc[lo:hi]
+                spills[year].write_table(pa.Table.from_pandas(part, schema=MERGED_SCHEMA, preserve_index=False))
+            partials.append(group_sums(df))
+
+            summary["rows_written"] += len(df)
+            summary["unmatched"] += int(df['CE'].isna().sum())
+
+            if len(partials) > 1:
+                # Keep the running sums small instead of one frame per chunk
+                partials = [combine_group_sums(partials)]
+    finally:
+        for spill in spills.values():
+            spill.close()
+
+    # Concatenate the years in order, one row group in memory at a time
+    with pq.ParquetWriter(partial, MERGED_SCHEMA, compression="snappy", write_statistics=True) as writer:
+        for year in sorted(spills):
+            spill = pq.ParquetFile(os.path.join(spill_dir, f"{year}.parquet"))
+            for i in range(spill.num_row_groups):
+                writer.write_table(spill.read_row_group(i))
+    os.replace(partial, output_path)
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+    processed_data, aggregated_data = datasets_from_sums(combine_group_sums(partials))
+    processed_data.to_csv(os.path.join(output_dir, "processed_data.csv"), index=False)
+    aggregated_data.to_csv(os.path.join(output_dir, "aggregated_data.csv"), index=False)
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        rate = summary["rows_read"] / elapsed if elapsed > 0 else float("inf")
+        print(f"Streaming build: {summary['rows_read']:,} rows read in {summary['chunks']} chunks, "
+              f"{summary['rows_written']:,} written, {summary['unmatched']:,} without CO2 "
+              f"({elapsed:.2f}s, {rate:,.0f} rows/s)")
+
+    return summary
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The pipeline modules (src/) and the synthetic input generator (benchmarks/)
+# are flat modules imported by name, as processing.py does from src/
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from conftest import REPO_DIR
+
+SRC_DIR = os.path.join(REPO_DIR, "src")
+
+
+def _run_script(path, source):
+    # Workers re-import the main script only when it is a file run by the interpreter
+    path.write_text(textwrap.dedent(source).format(src=SRC_DIR))
+    return subprocess.run([sys.executable, str(path)], capture_output=True, text=True, timeout=120)
+
+
+def test_run_parallel_spawn_from_script(tmp_path):
+    result = _run_script(tmp_path / "guarded.py", """
+        import multiprocessing
+        import sys
+
+        sys.path.insert(0, {src!r})
+        from parallel import run_parallel, workers_rerun_main
+
+        if __name__ == "__main__":
+            multiprocessing.set_start_method("spawn")
+            print(workers_rerun_main())
+            print(run_parallel(pow, [(2, i) for i in range(6)], workers=2))
+    """)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split("\n")[:2] == ["True", "[1, 2, 4, 8, 16, 32]"]
+
+
+def test_top_level_script_falls_back_to_one_process(tmp_path):
+    # processing.py runs its cells at the top level; with "spawn" it must not start workers
+    result = _run_script(tmp_path / "top_level.py", """
+        import multiprocessing
+        import sys
+
+        sys.path.insert(0, {src!r})
+        from parallel import run_parallel, workers_rerun_main
+
+        multiprocessing.set_start_method("spawn", force=True)
+        WORKERS = 2
+        if WORKERS != 1 and workers_rerun_main():
+            WORKERS = 1
+        print(WORKERS, run_parallel(pow, [(2, i) for i in range(6)], workers=WORKERS))
+    """)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "1 [1, 2, 4, 8, 16, 32]"
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+import pytest
+
+from ingest import load_co2
+from streaming import stream_gvc
+from synthetic import EXTRA_REGIONS, write_co2_workbook, write_gvc_csv
+
+COUNTRIES = ['AUS', 'AUT']
+YEARS = (2000, 2001)
+INDUSTRIES = 4
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("inputs")
+    gvc_path = str(folder / "gvc.csv")
+    co2_path = str(folder / "co2.xlsx")
+    rows = write_gvc_csv(gvc_path, COUNTRIES, industries=INDUSTRIES, years=YEARS)
+    write_co2_workbook(co2_path, COUNTRIES, years=YEARS)
+    CO2 = load_co2(co2_path, COUNTRIES, years=YEARS, cache=False, verbose=False)
+    return gvc_path, CO2, rows
+
+
+def _build(inputs, output_dir, chunksize):
+    gvc_path, CO2, _ = inputs
+    os.makedirs(output_dir)
+    summary = stream_gvc(gvc_path, CO2, str(output_dir), chunksize=chunksize, verbose=False)
+    df = pd.read_parquet(summary["path"]).astype({"country": str, "industry": str})
+    return summary, df.sort_values(["year", "country", "industry"]).reset_index(drop=True)
+
+
+def test_chunks_of_excluded_regions_only(inputs, tmp_path):
+    # One chunk per region: the trailing NLD and ROW chunks keep no rows
+    _, _, rows = inputs
+    region_rows = rows // (len(COUNTRIES) + len(EXTRA_REGIONS))
+    summary, df = _build(inputs, tmp_path / "chunked", chunksize=region_rows)
+    _, expected = _build(inputs, tmp_path / "single", chunksize=rows)
+
+    assert summary["chunks"] == len(COUNTRIES) + len(EXTRA_REGIONS)
+    assert summary["rows_read"] == rows
+    assert summary["rows_written"] == len(expected)
+    assert not os.path.exists(summary["path"] + ".years")
+    pd.testing.assert_frame_equal(df, expected)
+    for name in ("processed_data.csv", "aggregated_data.csv"):
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "chunked" / name),
+                                      pd.read_csv(tmp_path / "single" / name))